@@ -0,0 +1,45 @@
+"""add pending telemetry status index
+
+Revision ID: 3f1c9a7e2b64
+Revises: e4255c1640a7
+Create Date: 2025-09-22 18:42:11.204517
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "3f1c9a7e2b64"
+down_revision: Union[str, Sequence[str], None] = "e4255c1640a7"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_telemetry_agent_run_status__collection_id_pending",
+            "telemetry_agent_run_status",
+            ["collection_id"],
+            unique=False,
+            postgresql_where=sa.text(
+                "status = 'needs_processing' OR current_version > processed_version"
+            ),
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_telemetry_agent_run_status__collection_id_pending",
+            table_name="telemetry_agent_run_status",
+            postgresql_concurrently=True,
+        )
@@ -0,0 +1,81 @@
+"""telemetry accumulation key columns
+
+Revision ID: 7c2e5d91a4b3
+Revises: 3f1c9a7e2b64
+Create Date: 2025-09-23 10:14:37.562081
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "7c2e5d91a4b3"
+down_revision: Union[str, Sequence[str], None] = "3f1c9a7e2b64"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+KEY_COLUMNS = ["collection_id", "agent_run_id", "transcript_group_id", "transcript_id"]
+BACKFILL_BATCH_SIZE = 10_000
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # As wide as key itself, so any part of an existing key fits
+    for column in KEY_COLUMNS:
+        op.add_column(
+            "telemetry_accumulation", sa.Column(column, sa.String(length=255), nullable=True)
+        )
+
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block. The backfill runs here
+    # too, so the new columns are committed first and each batch commits on its own instead of
+    # holding row locks on the whole table.
+    with op.get_context().autocommit_block():
+        # Backfill the new columns from the existing "name=value:name=value" keys, walking the
+        # table by id. Rows written by code that already sets the columns are left alone.
+        connection = op.get_bind()
+        backfill = sa.text(
+            "UPDATE telemetry_accumulation SET "
+            + ", ".join(
+                f"{column} = substring(key from '(?:^|:){column}=([^:]*)')"
+                for column in KEY_COLUMNS
+            )
+            + " WHERE id > :after_id AND id <= :last_id AND collection_id IS NULL"
+        )
+        next_batch = sa.text(
+            "SELECT max(id) FROM (SELECT id FROM telemetry_accumulation WHERE id > :after_id "
+            "ORDER BY id LIMIT :limit) AS batch"
+        )
+        after_id = ""
+        while True:
+            last_id = connection.execute(
+                next_batch, {"after_id": after_id, "limit": BACKFILL_BATCH_SIZE}
+            ).scalar()
+            if last_id is None:
+                break
+            connection.execute(backfill, {"after_id": after_id, "last_id": last_id})
+            after_id = last_id
+
+        op.create_index(
+            "idx_telemetry_accumulation_lookup",
+            "telemetry_accumulation",
+            ["collection_id", "data_type", "agent_run_id"],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "idx_telemetry_accumulation_lookup",
+            table_name="telemetry_accumulation",
+            postgresql_concurrently=True,
+        )
+
+    for column in reversed(KEY_COLUMNS):
+        op.drop_column("telemetry_accumulation", column)
@@ -0,0 +1,110 @@
+"""telemetry accumulation timestamp
+
+Revision ID: b8d4f2a61c07
+Revises: 7c2e5d91a4b3
+Create Date: 2025-09-23 14:02:51.318406
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "b8d4f2a61c07"
+down_revision: Union[str, Sequence[str], None] = "7c2e5d91a4b3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BACKFILL_BATCH_SIZE = 10_000
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("telemetry_accumulation", sa.Column("timestamp", sa.Text(), nullable=True))
+
+    # CREATE/DROP INDEX CONCURRENTLY cannot run inside a transaction block. The backfill runs here
+    # too, so the new column is committed first and each batch commits on its own instead of
+    # holding row locks on the whole table.
+    with op.get_context().autocommit_block():
+        # Backfill the timestamp from the entry data, walking the table by id. Rows written by
+        # code that already sets the column are left alone.
+        connection = op.get_bind()
+        backfill = sa.text(
+            "UPDATE telemetry_accumulation SET timestamp = data ->> 'timestamp' "
+            "WHERE id > :after_id AND id <= :last_id "
+            "AND timestamp IS NULL AND data_type <> 'spans'"
+        )
+        next_batch = sa.text(
+            "SELECT max(id) FROM (SELECT id FROM telemetry_accumulation WHERE id > :after_id "
+            "ORDER BY id LIMIT :limit) AS batch"
+        )
+        after_id = ""
+        while True:
+            last_id = connection.execute(
+                next_batch, {"after_id": after_id, "limit": BACKFILL_BATCH_SIZE}
+            ).scalar()
+            if last_id is None:
+                break
+            connection.execute(backfill, {"after_id": after_id, "last_id": last_id})
+            after_id = last_id
+
+        op.create_index(
+            "idx_telemetry_accumulation_lookup_ts",
+            "telemetry_accumulation",
+            ["collection_id", "data_type", "agent_run_id", "timestamp"],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+        # Superseded by the index above
+        op.drop_index(
+            "idx_telemetry_accumulation_lookup",
+            table_name="telemetry_accumulation",
+            postgresql_concurrently=True,
+        )
+        # Entries are no longer looked up by key
+        op.drop_index(
+            "idx_telemetry_accumulation_key_type",
+            table_name="telemetry_accumulation",
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            op.f("ix_telemetry_accumulation__key"),
+            table_name="telemetry_accumulation",
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.create_index(
+            op.f("ix_telemetry_accumulation__key"),
+            "telemetry_accumulation",
+            ["key"],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "idx_telemetry_accumulation_key_type",
+            "telemetry_accumulation",
+            ["key", "data_type"],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "idx_telemetry_accumulation_lookup",
+            "telemetry_accumulation",
+            ["collection_id", "data_type", "agent_run_id"],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            "idx_telemetry_accumulation_lookup_ts",
+            table_name="telemetry_accumulation",
+            postgresql_concurrently=True,
+        )
+
+    op.drop_column("telemetry_accumulation", "timestamp")
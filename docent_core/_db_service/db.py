@@ -18,6 +18,9 @@ from docent_core._env_util import ENV
 
 logger = get_logger(__name__)
 
+DB_POOL_SIZE = 25
+DB_MAX_OVERFLOW = 25
+
 
 @dataclass
 class PGParams:
@@ -124,8 +127,8 @@ class DocentDB:
             # Initialize engine with connection pooling
             engine = create_async_engine(
                 connection_url,
-                pool_size=25,
-                max_overflow=25,
+                pool_size=DB_POOL_SIZE,
+                max_overflow=DB_MAX_OVERFLOW,
                 pool_timeout=30,
                 pool_recycle=1800,  # Recycle connections after 30 minutes
                 pool_pre_ping=True,  # Check connection validity before use
@@ -1,10 +1,12 @@
-import json
+import asyncio
+import traceback
 from typing import Any
 
 import anyio
 import redis.asyncio as redis
 from arq import ArqRedis
-from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel
+from pydantic_core import to_json
 
 from docent._log_util import get_logger
 from docent_core._env_util import ENV
@@ -20,6 +22,9 @@ _redis_lock = anyio.Lock()
 STREAM_KEY_FORMAT = "stream_{job_id}"
 STATE_KEY_FORMAT = "state_{job_id}"
 
+# How long JobStatePublisher waits after an update for more updates to coalesce with it
+JOB_STATE_FLUSH_INTERVAL_SECONDS = 0.05
+
 
 async def get_redis_client():
     global _redis_client
@@ -43,7 +48,7 @@ async def get_redis_client():
             )
             url = f"{redis_protocol}://{REDIS_USER_STRING}{REDIS_HOST}:{REDIS_PORT}"
 
-            _redis_client = ArqRedis(connection_pool=redis.ConnectionPool.from_url(url, decode_responses=True))  # type: ignore
+            _redis_client = ArqRedis(connection_pool=redis.ConnectionPool.from_url(url))  # type: ignore
 
             logger.info(f"Checking Redis connection to {url}")
             await verify_redis_connection(_redis_client)
@@ -83,7 +88,7 @@ async def publish_to_broker(collection_id: str | None, data: dict[str, Any]):
 
     channel = f"collection:{collection_id}" if collection_id is not None else "general:general"
     print(f"Publishing to channel {channel}!!!!!!")
-    await redis_client.publish(channel, json.dumps(jsonable_encoder(data)))  # type: ignore
+    await redis_client.publish(channel, to_json(data))  # type: ignore
     print(f"Published to channel {channel}!!!!!!")
 
 
@@ -102,7 +107,7 @@ async def publish_collection_update(collection_id: str, payload: dict[str, Any])
     """
     redis_client = await get_redis_client()
     channel = f"collection:{collection_id}"
-    await redis_client.publish(channel, json.dumps(jsonable_encoder(payload)))  # type: ignore
+    await redis_client.publish(channel, to_json(payload))  # type: ignore
 
 
 async def publish_view_update(collection_id: str, view_id: str, payload: dict[str, Any]):
@@ -120,7 +125,92 @@ async def publish_view_update(collection_id: str, view_id: str, payload: dict[st
     """
     redis_client = await get_redis_client()
     channel = f"collection:{collection_id}:view:{view_id}"
-    await redis_client.publish(channel, json.dumps(jsonable_encoder(payload)))  # type: ignore
+    await redis_client.publish(channel, to_json(payload))  # type: ignore
+
+
+class JobStatePublisher:
+    """Publishes a job's state to Redis for streaming to clients, coalescing rapid updates.
+
+    The latest state is kept under the job's state key, and each write is announced with a
+    "state_updated" event on the job's stream. Updates arriving within
+    JOB_STATE_FLUSH_INTERVAL_SECONDS of each other are collapsed into one write of the latest
+    state, with the SET and XADD sent as one MULTI/EXEC transaction in a single round trip.
+    Intermediate states would be superseded by the next read anyway.
+
+    Use as an async context manager; exiting writes any state that is still pending.
+    """
+
+    def __init__(
+        self,
+        redis_client: ArqRedis,
+        job_id: str,
+        flush_interval: float = JOB_STATE_FLUSH_INTERVAL_SECONDS,
+    ):
+        self.job_id = job_id
+        self.stream_key = STREAM_KEY_FORMAT.format(job_id=job_id)
+        self.state_key = STATE_KEY_FORMAT.format(job_id=job_id)
+        self._redis_client = redis_client
+        self._flush_interval = flush_interval
+        self._pending_state: BaseModel | None = None
+        self._updated = asyncio.Event()
+        self._closed = False
+        self._flusher: asyncio.Task[None] | None = None
+
+    async def __aenter__(self) -> "JobStatePublisher":
+        self._flusher = asyncio.create_task(self._run())
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        self._closed = True
+        self._updated.set()
+        if self._flusher is not None:
+            await self._flusher
+
+    async def finish(self) -> None:
+        """Announce that the job is finished and let its stream and state expire.
+
+        Call after leaving the context, so the final state has been flushed.
+        """
+        async with self._redis_client.pipeline(transaction=False) as pipe:  # type: ignore
+            pipe.xadd(self.stream_key, {"event": "finished"}, maxlen=200)  # type: ignore
+            pipe.expire(self.stream_key, 600)  # type: ignore
+            pipe.expire(self.state_key, 600)  # type: ignore
+            await pipe.execute()  # type: ignore
+
+    def publish(self, state: BaseModel) -> None:
+        """Record the job's latest state; it is written to Redis by the background flusher."""
+        self._pending_state = state
+        self._updated.set()
+
+    async def _run(self) -> None:
+        while True:
+            await self._updated.wait()
+            if not self._closed:
+                # Give further updates a chance to arrive, so they are coalesced into one write
+                await asyncio.sleep(self._flush_interval)
+            self._updated.clear()
+            await self._flush()
+            if self._closed:
+                return
+
+    async def _flush(self) -> None:
+        state, self._pending_state = self._pending_state, None
+        if state is None:
+            return
+
+        try:
+            # Serialize straight to bytes, which Redis takes as is
+            payload = to_json(state)
+            async with self._redis_client.pipeline(transaction=True) as pipe:  # type: ignore
+                # Update authoritative state with sliding 1800s TTL
+                pipe.set(self.state_key, payload, ex=1800)  # type: ignore
+                # Send a lightweight notifier event; trim to avoid growth
+                pipe.xadd(self.stream_key, {"event": "state_updated"}, maxlen=200)  # type: ignore
+                await pipe.execute()  # type: ignore
+        except Exception:
+            logger.error(
+                f"Failed to append event to Redis stream {self.stream_key} for job {self.job_id}: {traceback.format_exc()}"
+            )
 
 
 async def _enqueue_job(queue_name: str, func_name: str, *args: Any, **kwargs: Any) -> None:
@@ -129,9 +219,9 @@ async def _enqueue_job(queue_name: str, func_name: str, *args: Any, **kwargs: An
     print(f"Enqueued job {j} to {queue_name} with func {func_name}")
 
 
-async def enqueue_job(view_ctx: ViewContext, job_id: str) -> None:
+async def enqueue_job(view_ctx: ViewContext, job_id: str, func_name: str = "run_job") -> None:
     """Enqueue a job to the worker."""
-    await _enqueue_job(WORKER_QUEUE_NAME, "run_job", view_ctx, job_id)
+    await _enqueue_job(WORKER_QUEUE_NAME, func_name, view_ctx, job_id)
 
 
 async def cancel_job(job_id: str) -> None:
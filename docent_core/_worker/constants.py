@@ -2,6 +2,12 @@ from enum import Enum
 
 WORKER_QUEUE_NAME = "docent_worker_queue"
 JOB_TIMEOUT_SECONDS = 10 * 60  # 10 minutes
+JOB_RETRY_DELAY_SECONDS = 30  # For jobs that can't start yet, e.g. while a collection is locked
+DEFAULT_JOB_MAX_TRIES = 5  # For jobs enqueued under run_job
+# Embedding jobs wait for the collection's lock; enough tries to outlast another job holding it
+# for its full timeout. They run under their own arq function so the budget applies only to them.
+EMBEDDING_JOB_MAX_TRIES = JOB_TIMEOUT_SECONDS // JOB_RETRY_DELAY_SECONDS + 2
+EMBEDDING_JOB_FUNCTION_NAME = "run_embedding_job"
 
 
 class WorkerFunction(str, Enum):
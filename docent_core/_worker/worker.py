@@ -2,18 +2,26 @@
 Make sure to clean up any Redis streams and state keys after the job is finished!
 """
 
+import asyncio
+import sys
 import traceback
 from typing import Any
 
 import anyio
 from anyio.abc import TaskGroup
 from arq.connections import RedisSettings
-from arq.worker import run_worker
+from arq.worker import Retry, func, run_worker
 
 from docent._log_util import get_logger
 from docent_core._env_util import ENV, get_deployment_id, init_sentry_or_raise
 from docent_core._server._broker.redis_client import get_redis_client
-from docent_core._worker.constants import JOB_TIMEOUT_SECONDS, WORKER_QUEUE_NAME
+from docent_core._worker.constants import (
+    DEFAULT_JOB_MAX_TRIES,
+    EMBEDDING_JOB_FUNCTION_NAME,
+    EMBEDDING_JOB_MAX_TRIES,
+    JOB_TIMEOUT_SECONDS,
+    WORKER_QUEUE_NAME,
+)
 from docent_core._worker.job_worker_map import JOB_DISPATCHER_MAP
 from docent_core.docent.db.contexts import ViewContext
 from docent_core.docent.db.schemas.tables import JobStatus
@@ -22,16 +30,22 @@ from docent_core.docent.services.monoservice import MonoService
 logger = get_logger(__name__)
 
 
-async def run_job(_: Any, ctx: ViewContext, job_id: str):
+async def run_job(
+    arq_ctx: dict[str, Any],
+    ctx: ViewContext,
+    job_id: str,
+    max_tries: int = DEFAULT_JOB_MAX_TRIES,
+):
     mono_svc = await MonoService.init()
     canceled = False
+    retry: Retry | None = None
 
     REDIS = await get_redis_client()
     commands_queue = f"commands_{job_id}"
     response_queue = f"cancel_response_{job_id}"
 
     async def _run(tg: TaskGroup):
-        nonlocal canceled
+        nonlocal canceled, retry
 
         try:
             #########
@@ -62,7 +76,23 @@ async def run_job(_: Any, ctx: ViewContext, job_id: str):
                 raise ValueError(f"Unknown job type: {job.type}")
 
             # Run the job with the appropriate function
-            await JOB_DISPATCHER_MAP[job.type](ctx, job)
+            try:
+                await JOB_DISPATCHER_MAP[job.type](ctx, job)
+            except Retry:
+                # arq drops a job without running it once its tries are used up, which would
+                # leave it PENDING forever, so give up on the last try ourselves. max_tries must
+                # match the budget of the arq function the job was enqueued under.
+                if arq_ctx["job_try"] < max_tries:
+                    raise
+                reason = f"Could not start after {max_tries} tries"
+                logger.error(f"Job {job_id} canceled: {reason}")
+                await mono_svc.set_job_json(job_id, {**job.job_json, "cancel_reason": reason})
+                canceled = True
+        except Retry as e:
+            # The job can't run yet; arq runs it again later. Raised outside the task group so
+            # arq sees it unwrapped.
+            logger.info(f"Job {job_id} will be retried: {e}")
+            retry = e
         except anyio.get_cancelled_exc_class():
             canceled = True
             raise
@@ -76,7 +106,9 @@ async def run_job(_: Any, ctx: ViewContext, job_id: str):
 
             with anyio.CancelScope(shield=True):
                 # Update the job status
-                if canceled:
+                if retry is not None:
+                    await mono_svc.set_job_status(job_id, JobStatus.PENDING)
+                elif canceled:
                     logger.highlight(f"Job {job_id} canceled", color="red")
                     await mono_svc.set_job_status(job_id, JobStatus.CANCELED)
                 else:
@@ -100,11 +132,11 @@ async def run_job(_: Any, ctx: ViewContext, job_id: str):
         while True:
             _queue, command = await REDIS.blpop(commands_queue)  # type: ignore
             logger.info(f"{job_id} received {command}")
-            assert isinstance(command, str)
+            assert isinstance(command, bytes)
 
             # Handle cancel command with optional response ID
             match command:
-                case "cancel":
+                case b"cancel":
                     tg.cancel_scope.cancel()
                 case _:
                     logger.error(f"Unknown command received for job {job_id}: {str(command)}")  # type: ignore
@@ -113,6 +145,22 @@ async def run_job(_: Any, ctx: ViewContext, job_id: str):
         tg.start_soon(_run, tg)
         tg.start_soon(await_commands, tg)
 
+    if retry is not None:
+        raise retry
+
+
+async def run_embedding_job(arq_ctx: dict[str, Any], ctx: ViewContext, job_id: str):
+    """Run a job enqueued under EMBEDDING_JOB_FUNCTION_NAME, with its larger retry budget."""
+    await run_job(arq_ctx, ctx, job_id, max_tries=EMBEDDING_JOB_MAX_TRIES)
+
+
+async def startup(_: Any):
+    # Start tasks eagerly, so ones that can finish without blocking (e.g. gathered LLM calls
+    # served from cache) complete on creation instead of waiting for a loop iteration.
+    # anyio task groups opt out of eager starts, so job task groups are unaffected.
+    if sys.version_info >= (3, 12):
+        asyncio.get_running_loop().set_task_factory(asyncio.eager_task_factory)
+
 
 def run():
     # Initialize Sentry for production/staging environments
@@ -149,10 +197,19 @@ def run():
 
     run_worker(
         {
-            "functions": [run_job],
+            "functions": [
+                run_job,
+                func(
+                    run_embedding_job,
+                    name=EMBEDDING_JOB_FUNCTION_NAME,
+                    max_tries=EMBEDDING_JOB_MAX_TRIES,
+                ),
+            ],
+            "on_startup": startup,
             "redis_settings": redis_settings,
             "queue_name": WORKER_QUEUE_NAME,
             "max_jobs": 1,  # per worker
             "job_timeout": JOB_TIMEOUT_SECONDS,
+            "max_tries": DEFAULT_JOB_MAX_TRIES,
         }
     )
@@ -18,6 +18,7 @@ from sqlalchemy import (
     LargeBinary,
     String,
     Text,
+    text,
 )
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column, relationship
@@ -80,6 +81,41 @@ def sanitize_pg_text(text: str) -> str:
     return text
 
 
+def _needs_pg_sanitizing(text: str) -> bool:
+    # Everything sanitize_pg_text removes is either a null character or starts with a backslash
+    return "\x00" in text or "\\" in text
+
+
+def sanitize_pg_json(data: Any) -> Any:
+    """
+    Apply sanitize_pg_text to every string in JSON-like data, including dict keys.
+
+    This replaces round-tripping the data through json.dumps/json.loads. Dicts and lists are
+    updated in place (tuples become lists, as they would in JSON), and strings that can't contain
+    anything sanitize_pg_text removes are skipped, which is nearly all of them.
+    """
+    if isinstance(data, str):
+        return sanitize_pg_text(data) if _needs_pg_sanitizing(data) else data
+    if isinstance(data, dict):
+        data = cast(dict[Any, Any], data)
+        if any(isinstance(k, str) and _needs_pg_sanitizing(k) for k in data):
+            items = list(data.items())
+            data.clear()
+            for k, v in items:
+                data[sanitize_pg_json(k)] = v
+        for k, v in data.items():
+            data[k] = sanitize_pg_json(v)
+        return data
+    if isinstance(data, list):
+        data = cast(list[Any], data)
+        for i, v in enumerate(data):
+            data[i] = sanitize_pg_json(v)
+        return data
+    if isinstance(data, tuple):
+        return [sanitize_pg_json(v) for v in cast(tuple[Any, ...], data)]
+    return data
+
+
 class SQLAAgentRun(SQLABase):
     __tablename__ = TABLE_AGENT_RUN
 
@@ -109,9 +145,7 @@ class SQLAAgentRun(SQLABase):
     @classmethod
     def from_agent_run(cls, agent_run: AgentRun, collection_id: str) -> "SQLAAgentRun":
         # Sanitize raw text
-        metadata_json = json.loads(
-            sanitize_pg_text(json.dumps(to_jsonable_python(agent_run.metadata)))
-        )
+        metadata_json = sanitize_pg_json(to_jsonable_python(agent_run.metadata))
         text_for_search = sanitize_pg_text(agent_run.text)
         return cls(
             id=agent_run.id,
@@ -191,6 +225,15 @@ class SQLATelemetryAgentRunStatus(SQLABase):
     __table_args__ = (
         # Ensure one status record per agent run
         UniqueConstraint("agent_run_id", name="uq_telemetry_agent_run_status_agent_run_id"),
+        # Serves the "needs processing" lookups in TelemetryService, which filter on
+        # collection_id plus exactly this predicate
+        Index(
+            "ix_telemetry_agent_run_status__collection_id_pending",
+            "collection_id",
+            postgresql_where=text(
+                "status = 'needs_processing' OR current_version > processed_version"
+            ),
+        ),
     )
 
 
@@ -881,7 +924,13 @@ class SQLATelemetryAccumulation(SQLABase):
 
     id = mapped_column(String(36), primary_key=True, default=lambda: str(uuid4()))
 
-    key = mapped_column(String(255), nullable=False, index=True)
+    key = mapped_column(String(255), nullable=False)
+
+    # Components of the key, stored separately so lookups can use equality instead of a LIKE prefix
+    collection_id = mapped_column(String(255), nullable=True)
+    agent_run_id = mapped_column(String(255), nullable=True)
+    transcript_group_id = mapped_column(String(255), nullable=True)
+    transcript_id = mapped_column(String(255), nullable=True)
 
     # Data type/category (e.g., "spans", "scores", "metadata", "transcript_metadata", "transcript_group_metadata")
     data_type = mapped_column(Text, nullable=False, index=True)
@@ -891,8 +940,19 @@ class SQLATelemetryAccumulation(SQLABase):
         DateTime, default=lambda: datetime.now(UTC).replace(tzinfo=None), nullable=False, index=True
     )
 
+    # Client-reported timestamp of the entry, copied out of data for ordering (unset for spans)
+    timestamp = mapped_column(Text, nullable=True)
+
     # Optional user ID for tracking who created this data
     user_id = mapped_column(String(36), ForeignKey(f"{TABLE_USER}.id"), nullable=True, index=True)
 
-    # Composite index for efficient queries by key and data type
-    __table_args__ = (Index("idx_telemetry_accumulation_key_type", "key", "data_type"),)
+    # Composite index for lookups by collection, data type and agent run, ordered by timestamp
+    __table_args__ = (
+        Index(
+            "idx_telemetry_accumulation_lookup_ts",
+            "collection_id",
+            "data_type",
+            "agent_run_id",
+            "timestamp",
+        ),
+    )
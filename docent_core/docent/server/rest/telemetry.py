@@ -1,11 +1,16 @@
 import time
+from typing import AsyncContextManager, Callable
 
 from fastapi import APIRouter, Depends, HTTPException, Request
 from fastapi.responses import JSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from docent._log_util import get_logger
 from docent_core.docent.db.schemas.auth_models import Permission, User
-from docent_core.docent.server.dependencies.database import require_collection_exists
+from docent_core.docent.server.dependencies.database import (
+    get_session_cm_factory,
+    require_collection_exists,
+)
 from docent_core.docent.server.dependencies.permissions import require_collection_permission
 from docent_core.docent.server.dependencies.services import (
     get_mono_svc,
@@ -34,6 +39,9 @@ async def trace_endpoint(
         get_telemetry_accumulation_service
     ),
     telemetry_svc: TelemetryService = Depends(get_telemetry_service),
+    session_cm_factory: Callable[[], AsyncContextManager[AsyncSession]] = Depends(
+        get_session_cm_factory
+    ),
 ):
     """
     Direct trace endpoint for OpenTelemetry collector HTTP exporter.
@@ -91,7 +99,9 @@ async def trace_endpoint(
             await telemetry_svc.session.commit()
 
         # Accumulate spans into database
-        await telemetry_svc.accumulate_spans(spans, user.id, accumulation_service)
+        await telemetry_svc.accumulate_spans(
+            spans, user.id, accumulation_service, session_cm_factory
+        )
 
         # Trigger background processing jobs for each collection
         for collection_id in collection_ids:
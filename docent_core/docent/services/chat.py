@@ -350,7 +350,8 @@ class ChatService:
         while not done:
             # Block until a notifier event arrives
             try:
-                results = await REDIS.xread({stream_key: last_id}, block=30000, count=1)  # type: ignore
+                # Read every pending event; only the latest one matters since the state is re-read
+                results = await REDIS.xread({stream_key: last_id}, block=30000)  # type: ignore
 
                 # Timed out waiting for events; loop again
 
@@ -365,12 +366,12 @@ class ChatService:
                     # Advance the cursor so we don't miss subsequent events
                     last_id = _entry_id
                     # Parse out the last event entry
-                    data = cast(dict[str, str], _data)
+                    data = cast(dict[bytes, bytes], _data)
                     logger.info(f"Job {job_id} received event data {data}")
 
                     # Only look at state_updated and finished events
-                    event = data.get("event")
-                    if event not in {"state_updated", "finished"}:
+                    event = data.get(b"event")
+                    if event not in {b"state_updated", b"finished"}:
                         logger.error(f"Job {job_id} received unknown event {event}")
                         continue
 
@@ -380,7 +381,7 @@ class ChatService:
                         yield state
 
                     # If done, return
-                    if event == "finished":
+                    if event == b"finished":
                         done = True
                         break
             except Exception as e:
@@ -1,12 +1,16 @@
 from __future__ import annotations
 
+import asyncio
 import hashlib
-from contextlib import asynccontextmanager
+from collections import defaultdict, deque
+from contextlib import asynccontextmanager, suppress
 from datetime import UTC, datetime, timedelta
 from decimal import Decimal
 from typing import (
     Any,
     AsyncIterator,
+    Awaitable,
+    Callable,
     Literal,
     ParamSpec,
     Sequence,
@@ -37,6 +41,7 @@ from docent_core._db_service.db import DocentDB
 from docent_core._llm_util.data_models.llm_output import AsyncEmbeddingStreamingCallback
 from docent_core._llm_util.providers.openai import get_chunked_openai_embeddings_async
 from docent_core._server._broker.redis_client import enqueue_job
+from docent_core._worker.constants import EMBEDDING_JOB_FUNCTION_NAME
 from docent_core.docent.db.contexts import ViewContext
 from docent_core.docent.db.filters import ComplexFilter
 from docent_core.docent.db.schemas.auth_models import (
@@ -81,6 +86,12 @@ P = ParamSpec("P")
 T = TypeVar("T")
 pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
 
+# Postgres only exposes index build progress through pg_stat_progress_create_index
+INDEXING_PROGRESS_POLL_INTERVAL_SECONDS = 1.0
+
+AsyncIndexingProgressCallback = Callable[[str, int], Awaitable[None]]
+"""Called with the index build phase and percent complete whenever either changes."""
+
 
 class _NotGiven:
     """Sentinel class for detecting when a parameter was not provided."""
@@ -517,7 +528,7 @@ class MonoService:
 
             # Enqueue a job in pg and start a redis worker
             job_id = await self.add_embedding_job(collection_id, should_index)
-            await enqueue_job(ctx, job_id)  # type: ignore
+            await enqueue_job(ctx, job_id, func_name=EMBEDDING_JOB_FUNCTION_NAME)  # type: ignore
 
             logger.info(f"Enqueued embedding job {job_id} for collection {collection_id}")
 
@@ -1123,11 +1134,36 @@ class MonoService:
 
         return True
 
+    async def _monitor_indexing_progress(
+        self, collection_id: str, progress_callback: AsyncIndexingProgressCallback
+    ) -> None:
+        """Report the progress of a running index build each time its phase or percent changes."""
+        last_progress: tuple[str, int] | None = None
+        while True:
+            await asyncio.sleep(INDEXING_PROGRESS_POLL_INTERVAL_SECONDS)
+
+            # Progress reporting is best-effort, and must not fail the index build
+            try:
+                phase, percent = await self.get_indexing_progress(collection_id)
+                if phase is None:
+                    continue
+
+                progress = (phase, percent or 0)
+                if progress != last_progress:
+                    last_progress = progress
+                    await progress_callback(*progress)
+            except Exception as e:
+                logger.warning(f"Failed to report indexing progress for {collection_id}: {e}")
+
     async def compute_ivfflat_index(
         self,
         ctx: ViewContext,
+        progress_callback: AsyncIndexingProgressCallback | None = None,
     ) -> str:
-        """Create an IVFFlat index for embeddings of agent runs in the given view context."""
+        """Create an IVFFlat index for embeddings of agent runs in the given view context.
+
+        If a progress callback is given, it is called while the index is being built.
+        """
         # Check if embeddings exist for agent runs in this collection
         async with self.db.session() as session:
             count_query = (
@@ -1171,7 +1207,20 @@ class MonoService:
             )
 
             logger.info(f"Creating IVFFlat index {index_name} with {lists} lists...")
-            await conn.execute(create_index_query)
+            monitor = (
+                asyncio.create_task(
+                    self._monitor_indexing_progress(ctx.collection_id, progress_callback)
+                )
+                if progress_callback is not None
+                else None
+            )
+            try:
+                await conn.execute(create_index_query)
+            finally:
+                if monitor is not None:
+                    monitor.cancel()
+                    with suppress(asyncio.CancelledError):
+                        await monitor
             logger.info(f"Successfully created IVFFlat index {index_name}")
 
         return index_name
@@ -1201,20 +1250,6 @@ class MonoService:
             result = await session.execute(query)
             return result.scalar() or 0
 
-    async def get_oldest_active_embedding_job(self, collection_id: str) -> SQLAJob | None:
-        async with self.db.session() as session:
-            query = (
-                select(SQLAJob)
-                .where(
-                    SQLAJob.type == "compute_embeddings",
-                    SQLAJob.job_json["collection_id"].astext == collection_id,
-                    SQLAJob.status == JobStatus.RUNNING,
-                )
-                .order_by(SQLAJob.created_at.asc())
-            )
-            result = await session.execute(query)
-            return result.scalar_one_or_none()
-
     ########
     # Jobs #
     ########
@@ -1761,10 +1796,7 @@ class MonoService:
                 await db_service.compute_filter(collection_id, filter_id)
             ```
         """
-        # Create integer keys from the string IDs using hash functions
-        # We use two separate hashing algorithms to minimize collision risk
-        fg_hash = int(hashlib.md5(collection_id.encode()).hexdigest(), 16) % (2**31 - 1)
-        action_hash = int(hashlib.sha1(action_id.encode()).hexdigest(), 16) % (2**31 - 1)
+        fg_hash, action_hash = self._advisory_lock_keys(collection_id, action_id)
 
         async with self.db.engine.connect() as conn:
             await conn.execution_options(isolation_level="AUTOCOMMIT")
@@ -1787,6 +1819,49 @@ class MonoService:
                 )
                 logger.info(f"Released advisory lock for {collection_id}/{action_id}")
 
+    @asynccontextmanager
+    async def try_advisory_lock(self, collection_id: str, action_id: str) -> AsyncIterator[bool]:
+        """Like `advisory_lock`, but doesn't wait if the lock is already held.
+
+        Yields whether the lock was acquired; if not, the caller must not do the protected work.
+
+        Example:
+            ```python
+            async with db_service.try_advisory_lock(collection_id, "compute_filter") as acquired:
+                if acquired:
+                    await db_service.compute_filter(collection_id, filter_id)
+            ```
+        """
+        fg_hash, action_hash = self._advisory_lock_keys(collection_id, action_id)
+
+        async with self.db.engine.connect() as conn:
+            await conn.execution_options(isolation_level="AUTOCOMMIT")
+
+            result = await conn.execute(
+                text("SELECT pg_try_advisory_lock(:key1, :key2)"),
+                {"key1": fg_hash, "key2": action_hash},
+            )
+            if not result.scalar_one():
+                yield False
+                return
+
+            try:
+                logger.info(f"Acquired advisory lock for {collection_id}/{action_id}")
+                yield True
+            finally:
+                await conn.execute(
+                    text("SELECT pg_advisory_unlock(:key1, :key2)"),
+                    {"key1": fg_hash, "key2": action_hash},
+                )
+                logger.info(f"Released advisory lock for {collection_id}/{action_id}")
+
+    def _advisory_lock_keys(self, collection_id: str, action_id: str) -> tuple[int, int]:
+        # Create integer keys from the string IDs using hash functions
+        # We use two separate hashing algorithms to minimize collision risk
+        fg_hash = int(hashlib.md5(collection_id.encode()).hexdigest(), 16) % (2**31 - 1)
+        action_hash = int(hashlib.sha1(action_id.encode()).hexdigest(), 16) % (2**31 - 1)
+        return fg_hash, action_hash
+
     def _create_fingerprint(self, raw_api_key: str) -> str:
         """Create a deterministic fingerprint for a key using HMAC-SHA256."""
         import hashlib
@@ -2100,44 +2175,30 @@ def sort_transcript_groups_by_parent_order(
     Returns:
         Sorted list of SQLATranscriptGroup objects with parents before children
     """
-    # Create a mapping of group ID to group object
-    group_map = {group.id: group for group in transcript_group_data}
+    group_ids = {group.id for group in transcript_group_data}
 
-    # Create a mapping of parent ID to list of child IDs
-    parent_to_children: dict[str, list[str]] = {}
+    # Map each parent ID to its children in the batch; groups whose parent is not in the batch
+    # have nothing to wait for and are ready immediately
+    children_by_parent: defaultdict[str, list[SQLATranscriptGroup]] = defaultdict(list)
+    ready: deque[SQLATranscriptGroup] = deque()
     for group in transcript_group_data:
-        if group.parent_transcript_group_id:
-            if group.parent_transcript_group_id not in parent_to_children:
-                parent_to_children[group.parent_transcript_group_id] = []
-            parent_to_children[group.parent_transcript_group_id].append(group.id)
+        parent_id = group.parent_transcript_group_id
+        if parent_id and parent_id in group_ids and parent_id != group.id:
+            children_by_parent[parent_id].append(group)
+        else:
+            ready.append(group)
 
-    # Topological sort: start with groups that have no parents
+    # Kahn's algorithm: each group has a single parent, so it becomes ready once that parent is
+    # emitted. Iterative, so deep hierarchies don't hit the recursion limit.
     sorted_groups: list[SQLATranscriptGroup] = []
-    visited: set[str] = set()
-
-    def visit(group_id: str) -> None:
-        if group_id in visited:
-            return
-        visited.add(group_id)
-
-        # Add this group to the sorted list first (parents before children)
-        if group_id in group_map:
-            sorted_groups.append(group_map[group_id])
-
-        # Then visit all children
-        if group_id in parent_to_children:
-            for child_id in parent_to_children[group_id]:
-                if child_id in group_map:  # Only visit if child is in our data
-                    visit(child_id)
-
-    # Visit all groups that have no parents first
-    for group in transcript_group_data:
-        if not group.parent_transcript_group_id:
-            visit(group.id)
-
-    # Visit any remaining groups (shouldn't happen in a valid tree, but just in case)
-    for group in transcript_group_data:
-        if group.id not in visited:
-            visit(group.id)
+    while ready:
+        group = ready.popleft()
+        sorted_groups.append(group)
+        ready.extend(children_by_parent.pop(group.id, ()))
+
+    # Groups in a parent cycle are never reached (shouldn't happen in a valid tree, but just in case)
+    if len(sorted_groups) < len(transcript_group_data):
+        emitted = {id(group) for group in sorted_groups}
+        sorted_groups.extend(group for group in transcript_group_data if id(group) not in emitted)
 
     return sorted_groups
@@ -1,15 +1,47 @@
+import asyncio
 import base64
+import copy
+import functools
+import itertools
 import json
+import logging
+import os
+import sys
 import uuid
+from collections import Counter, defaultdict
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional, Sequence, cast
+from typing import (
+    Any,
+    AsyncContextManager,
+    Callable,
+    Dict,
+    Hashable,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    cast,
+)
 from uuid import uuid4
 
 from google.protobuf.json_format import MessageToDict
 from opentelemetry.proto.collector.trace.v1 import trace_service_pb2
-from sqlalchemy import delete, func, or_, select, update
+from pydantic_core import from_json
+from sqlalchemy import (
+    ColumnElement,
+    String,
+    Table,
+    delete,
+    func,
+    literal_column,
+    or_,
+    select,
+    update,
+)
+from sqlalchemy.dialects.postgresql import array, insert
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.inspection import inspect as sqla_inspect
 
 from docent._log_util import get_logger
 from docent.data_models import (
@@ -26,6 +58,8 @@ from docent.data_models.chat import (
     parse_chat_message,
 )
 from docent.data_models.chat.tool import ToolCall
+from docent_core._db_service.db import DB_MAX_OVERFLOW, DB_POOL_SIZE
+from docent_core._db_service.schemas.base import SQLABase
 from docent_core._server._analytics.posthog import AnalyticsClient
 from docent_core.docent.db.contexts import ViewContext
 from docent_core.docent.db.schemas.auth_models import User
@@ -36,7 +70,7 @@ from docent_core.docent.db.schemas.tables import (
     SQLATranscript,
     SQLATranscriptGroup,
     TelemetryAgentRunStatus,
-    sanitize_pg_text,
+    sanitize_pg_json,
 )
 from docent_core.docent.services.monoservice import (
     MonoService,
@@ -46,6 +80,145 @@ from docent_core.docent.services.telemetry_accumulation import TelemetryAccumula
 
 logger = get_logger(__name__)
 
+# Maximum number of agent runs a single telemetry processing job claims at once
+AGENT_RUN_PROCESSING_BATCH_SIZE = 100
+# Most sessions accumulate_spans opens at once, so one request can't exhaust the connection pool
+ACCUMULATION_MAX_CONCURRENT_SESSIONS = DB_POOL_SIZE + DB_MAX_OVERFLOW
+
+# Keys that may hold a gen_ai message's content, in order of preference
+_MESSAGE_CONTENT_KEYS = ("content", "user", "assistant", "system", "developer")
+# Role implied by a content key when a gen_ai message has no explicit role, in order of preference
+_ROLE_BY_CONTENT_KEY = {
+    "user": "user",
+    "assistant": "assistant",
+    "system": "system",
+    "developer": "system",
+}
+
+# Prefix of agent_run_metadata event attributes that carry metadata
+_METADATA_ATTRIBUTE_PREFIX = "metadata."
+_METADATA_ATTRIBUTE_PREFIX_LENGTH = len(_METADATA_ATTRIBUTE_PREFIX)
+
+
+# Strings shorter than this are interned when they recur across messages (roles, tool names, ids)
+_INTERN_MAX_LENGTH = 64
+
+
+def _intern_short(value: Any) -> Any:
+    """
+    Intern short strings that repeat across many parsed messages, such as roles, tool function
+    names and tool call ids, so equal values share one object. Other values are returned as is.
+    """
+    if type(value) is str and len(value) < _INTERN_MAX_LENGTH:
+        return sys.intern(value)
+    return value
+
+
+# (role, len(text), hash(text)) of a chat message; equal messages always have equal fingerprints
+MessageFingerprint = tuple[str, int, int]
+
+
+def _message_fingerprint(
+    message: ChatMessage,
+    cache: Dict[int, tuple[ChatMessage, MessageFingerprint]] | None = None,
+) -> MessageFingerprint:
+    """
+    Fingerprint a chat message for cheap inequality checks during thread matching.
+
+    The cache is keyed by id(message) and holds a reference to the message itself, so an id
+    can't be reused by another message while its entry exists.
+    """
+    if cache is not None and (entry := cache.get(id(message))) is not None:
+        return entry[1]
+    text = message.text
+    fingerprint = (message.role, len(text), hash(text))
+    if cache is not None:
+        cache[id(message)] = (message, fingerprint)
+    return fingerprint
+
+
+def _chat_thread_head_keys(message: ChatMessage) -> List[Hashable | None]:
+    """
+    Keys under which a chat thread starting with message is indexed for thread matching.
+
+    matching_thread_start can only pair two first messages that share a (role, text) key or,
+    for assistant messages, the same set of tool call ids. A tool result with a tool_call_id
+    may be skipped over instead, so it can pair with any first message and gets the None key.
+    """
+    if message.role == "tool" and message.tool_call_id:
+        return [None]
+    keys: List[Hashable | None] = [(message.role, message.text)]
+    if message.role == "assistant" and message.tool_calls:
+        keys.append(frozenset(tool_call.id for tool_call in message.tool_calls))
+    return keys
+
+
+@functools.lru_cache(maxsize=256)
+def _parse_content_array(content: str) -> tuple[dict[str, Any], ...] | None:
+    """
+    Parse message content that is a JSON array, keeping only its object items.
+
+    The same tool output is usually repeated in every later prompt of an agent run, so parse
+    results are cached. Callers must not mutate the returned items.
+
+    Returns:
+        The object items of the array, or None if content isn't valid JSON
+    """
+    try:
+        # pydantic_core's jiter-based parser is several times faster than json.loads
+        content_array = from_json(content)
+    except ValueError as e:
+        logger.debug(
+            f"Content is not valid JSON: {e}, treating as regular content. Start of content: {str(content)[:200]}"
+        )
+        return None
+    if not isinstance(content_array, list):
+        return None
+    return tuple(
+        cast(dict[str, Any], item)
+        for item in cast(List[Any], content_array)
+        if isinstance(item, dict)
+    )
+
+
+class _SpanDebugInfo:
+    """
+    Helpful debugging information from a span for logging purposes, formatted lazily.
+
+    Pass it as a %-style logging argument: the key identifiers are only formatted into a string
+    for easy log searching when a log record that uses it is actually emitted.
+    """
+
+    __slots__ = ("span",)
+
+    def __init__(self, span: Dict[str, Any]):
+        self.span = span
+
+    def __str__(self) -> str:
+        span_attrs = self.span.get("attributes", {})
+        collection_id = span_attrs.get("collection_id", "unknown")
+        agent_run_id = span_attrs.get("agent_run_id", "unknown")
+        transcript_group_id = span_attrs.get("transcript_group_id", "unknown")
+        transcript_id = span_attrs.get("transcript_id", "unknown")
+        raw_span_id = self.span.get("raw_span_id", self.span.get("span_id", "unknown"))
+
+        return f"collection_id={collection_id}, agent_run_id={agent_run_id}, transcript_group_id={transcript_group_id}, transcript_id={transcript_id}, span_id={raw_span_id}"
+
+
+def _needs_processing() -> ColumnElement[bool]:
+    """
+    Whether an agent run status row needs processing.
+
+    The status is rendered as a literal rather than a bound parameter so that the predicate
+    matches the partial index ix_telemetry_agent_run_status__collection_id_pending, which
+    Postgres can't prove for a generic plan with a parameter in its place.
+    """
+    return or_(
+        SQLATelemetryAgentRunStatus.status
+        == literal_column(f"'{TelemetryAgentRunStatus.NEEDS_PROCESSING.value}'"),
+        SQLATelemetryAgentRunStatus.current_version > SQLATelemetryAgentRunStatus.processed_version,
+    )
+
 
 class TelemetryService:
     def __init__(self, session: AsyncSession, mono_svc: MonoService):
@@ -67,10 +240,7 @@ class TelemetryService:
     ) -> str:
         """Store telemetry log data in the database."""
         # Sanitize the JSON data to remove null characters and other problematic Unicode sequences
-        # Convert to JSON string, sanitize, then parse back to dict
-        json_str = json.dumps(json_data)
-        sanitized_json_str = sanitize_pg_text(json_str)
-        sanitized_json_data = json.loads(sanitized_json_str)
+        sanitized_json_data = sanitize_pg_json(json_data)
 
         telemetry_id = str(uuid4())
         self.session.add(
@@ -131,7 +301,7 @@ class TelemetryService:
 
     async def process_agent_runs_for_collection(self, collection_id: str, user: User) -> List[str]:
         """
-        Process all agent runs that need processing for a collection.
+        Process a batch of agent runs that need processing for a collection.
 
         This method handles the complete processing workflow for a collection,
         processing each agent run individually by pulling its accumulated data
@@ -144,8 +314,11 @@ class TelemetryService:
         Returns:
             List[str]: List of agent run IDs that were successfully processed
         """
-        # Atomically get agent runs that need processing and mark them as processing
+        # Atomically get agent runs that need processing and mark them as processing. Commit the
+        # claim right away so the status rows aren't locked while the runs are processed, which
+        # would block ingestion from flagging the same runs for reprocessing.
         agent_run_versions = await self.get_and_mark_agent_runs_for_processing(collection_id)
+        await self.session.commit()
 
         if not agent_run_versions:
             logger.info(f"No agent runs need processing for collection {collection_id}")
@@ -158,8 +331,9 @@ class TelemetryService:
         # Process each agent run individually
         processed_count = 0
         successfully_processed_agent_run_ids: List[str] = []
-        successfully_processed_versions: dict[str, int] = {}
 
+        # Each agent run is committed on its own, together with its completion status, so a
+        # failure or a timeout only loses the run being processed
         for agent_run_id, current_version in agent_run_versions.items():
             try:
                 logger.info(
@@ -174,29 +348,32 @@ class TelemetryService:
                 )
 
                 if success:
+                    await self._mark_agent_runs_as_completed(
+                        collection_id, {agent_run_id: current_version}
+                    )
+                    await self.session.commit()
                     processed_count += 1
                     successfully_processed_agent_run_ids.append(agent_run_id)
-                    successfully_processed_versions[agent_run_id] = current_version
                     logger.info(
                         f"Successfully processed agent run {agent_run_id} (version {current_version})"
                     )
                 else:
+                    await self.session.rollback()
                     logger.error(f"Failed to process agent run {agent_run_id}")
                     # Mark agent run as errored on failure
                     await self._mark_agent_runs_as_errored(
                         collection_id, {agent_run_id}, "Processing failed"
                     )
+                    await self.session.commit()
 
             except Exception as e:
+                await self.session.rollback()
                 # Mark agent run as needs_processing again if processing failed
                 await self._mark_agent_runs_as_errored(collection_id, {agent_run_id}, str(e))
+                await self.session.commit()
                 logger.error(f"Error processing agent run {agent_run_id}: {str(e)}")
                 continue
 
-        # Mark all successfully processed agent runs as completed with their versions
-        if successfully_processed_versions:
-            await self._mark_agent_runs_as_completed(collection_id, successfully_processed_versions)
-
         logger.info(
             f"Successfully processed {processed_count} out of {len(agent_run_versions)} agent runs in collection {collection_id}"
         )
@@ -502,11 +679,7 @@ class TelemetryService:
             trace_data = MessageToDict(export_request, preserving_proto_field_name=True)
 
             # Sanitize the trace data to remove null characters and other problematic Unicode sequences
-            # Convert to JSON string, sanitize, then parse back to dict
-            json_str = json.dumps(trace_data)
-            sanitized_json_str = sanitize_pg_text(json_str)
-            sanitized_trace_data = json.loads(sanitized_json_str)
-            return sanitized_trace_data
+            return sanitize_pg_json(trace_data)
         except Exception as e:
             logger.error(f"Error parsing protobuf traces: {str(e)}")
             raise ValueError(f"Invalid protobuf format: {str(e)}")
@@ -543,6 +716,7 @@ class TelemetryService:
 
                     # Process individual spans
                     spans = scope_span.get("spans", [])
+                    debug_enabled = logger.isEnabledFor(logging.DEBUG)
 
                     for span in spans:
                         extracted_span = self.otel_span_format_to_dict(
@@ -550,9 +724,8 @@ class TelemetryService:
                         )
                         extracted_spans.append(extracted_span)
 
-                        logger.debug(
-                            f"  Extracted span: {self._get_span_debug_info(extracted_span)}"
-                        )
+                        if debug_enabled:
+                            logger.debug("  Extracted span: %s", _SpanDebugInfo(extracted_span))
 
             return extracted_spans
 
@@ -717,25 +890,27 @@ class TelemetryService:
         )
 
         # Sanitize the processed span to remove null characters and other problematic Unicode sequences
-        # Convert to JSON string, sanitize, then parse back to dict
-        json_str = json.dumps(processed_span)
-        sanitized_json_str = sanitize_pg_text(json_str)
-        sanitized_span = json.loads(sanitized_json_str)
-        return sanitized_span
+        return sanitize_pg_json(processed_span)
 
     async def accumulate_spans(
         self,
         spans: List[Dict[str, Any]],
         user_id: str | None = None,
         accumulation_service: TelemetryAccumulationService | None = None,
+        session_cm_factory: Callable[[], AsyncContextManager[AsyncSession]] | None = None,
     ) -> None:
         """
         Accumulate spans by collection_id for later processing and mark agent runs as needing processing.
 
+        When spans span multiple collections and a session_cm_factory is provided, each collection
+        is accumulated concurrently on its own session, since a single AsyncSession cannot run
+        concurrent operations. A collection that fails is logged without affecting the others.
+
         Args:
             spans: List of processed spans to accumulate
             user_id: Optional user ID for tracking who created the spans
             accumulation_service: Optional service instance to use
+            session_cm_factory: Optional factory for per-collection sessions
         """
         # Group spans by collection_id for efficient processing
         spans_by_collection: Dict[str, List[Dict[str, Any]]] = {}
@@ -749,40 +924,77 @@ class TelemetryService:
                     spans_by_collection[collection_id] = []
                 spans_by_collection[collection_id].append(span)
             else:
-                logger.error(
-                    f"Skipping span - missing collection_id - {self._get_span_debug_info(span)}"
-                )
+                logger.error("Skipping span - missing collection_id - %s", _SpanDebugInfo(span))
+
+        if not spans_by_collection:
+            return
 
         # Add spans to accumulation
-        for collection_id, collection_spans in spans_by_collection.items():
-            if accumulation_service:
+        if len(spans_by_collection) > 1 and session_cm_factory is not None:
+
+            semaphore = asyncio.Semaphore(ACCUMULATION_MAX_CONCURRENT_SESSIONS)
+
+            async def _add_spans_for_collection(
+                collection_id: str, collection_spans: List[Dict[str, Any]]
+            ) -> None:
+                async with semaphore, session_cm_factory() as session:
+                    await TelemetryAccumulationService(session).add_spans(
+                        collection_id, collection_spans, user_id
+                    )
+
+            # Each collection commits on its own session, so one failing collection must not
+            # abandon the others mid-write
+            results = await asyncio.gather(
+                *(
+                    _add_spans_for_collection(collection_id, collection_spans)
+                    for collection_id, collection_spans in spans_by_collection.items()
+                ),
+                return_exceptions=True,
+            )
+            for collection_id, result in zip(spans_by_collection, results):
+                if isinstance(result, BaseException):
+                    logger.error(
+                        f"Failed to accumulate spans for collection {collection_id}: {result}",
+                        exc_info=result,
+                    )
+        elif accumulation_service:
+            for collection_id, collection_spans in spans_by_collection.items():
                 await accumulation_service.add_spans(collection_id, collection_spans, user_id)
-            else:
-                logger.error("Accumulation service not found, skipping accumulation")
+        else:
+            logger.error("Accumulation service not found, skipping accumulation")
 
-    async def get_and_mark_agent_runs_for_processing(self, collection_id: str) -> dict[str, int]:
+    async def get_and_mark_agent_runs_for_processing(
+        self, collection_id: str, batch_size: int = AGENT_RUN_PROCESSING_BATCH_SIZE
+    ) -> dict[str, int]:
         """
         Atomically get agent runs that need processing and mark them as processing.
         Returns both the agent run IDs and their current versions.
 
+        Claims at most batch_size agent runs, skipping status rows that are locked by another
+        in-flight transaction so that concurrent workers pick disjoint batches instead of
+        waiting on each other. Remaining work is picked up by the follow-up job that the
+        telemetry worker queues via ensure_telemetry_processing_for_collection.
+
         Args:
             collection_id: The collection ID
+            batch_size: Maximum number of agent runs to claim
 
         Returns:
             Dictionary mapping agent_run_id to current_version for successfully marked agent runs
         """
 
-        stmt = (
-            update(SQLATelemetryAgentRunStatus)
+        claimable_ids = (
+            select(SQLATelemetryAgentRunStatus.id)
             .where(
-                or_(
-                    SQLATelemetryAgentRunStatus.status
-                    == TelemetryAgentRunStatus.NEEDS_PROCESSING.value,
-                    SQLATelemetryAgentRunStatus.current_version
-                    > SQLATelemetryAgentRunStatus.processed_version,
-                ),
+                _needs_processing(),
                 SQLATelemetryAgentRunStatus.collection_id == collection_id,
             )
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        stmt = (
+            update(SQLATelemetryAgentRunStatus)
+            .where(SQLATelemetryAgentRunStatus.id.in_(claimable_ids))
             .values(status=TelemetryAgentRunStatus.PROCESSING.value)
             .returning(
                 SQLATelemetryAgentRunStatus.agent_run_id,
@@ -790,9 +1002,6 @@ class TelemetryService:
             )
         )
 
-        # Log the SQL query for debugging
-        logger.info(f"SQL Query: {stmt.compile(compile_kwargs={'literal_binds': True})}")
-
         result = await self.session.execute(stmt)
         rows = result.fetchall()
 
@@ -818,12 +1027,7 @@ class TelemetryService:
             select(SQLATelemetryAgentRunStatus.agent_run_id)
             .where(
                 SQLATelemetryAgentRunStatus.collection_id == collection_id,
-                or_(
-                    SQLATelemetryAgentRunStatus.status
-                    == TelemetryAgentRunStatus.NEEDS_PROCESSING.value,
-                    SQLATelemetryAgentRunStatus.current_version
-                    > SQLATelemetryAgentRunStatus.processed_version,
-                ),
+                _needs_processing(),
             )
             .limit(1)
         )
@@ -954,8 +1158,6 @@ class TelemetryService:
 
             await self.session.execute(update_stmt)
 
-        await self.session.commit()
-
         logger.info(
             f"Marked {len(agent_run_ids)} agent runs as needs_processing after error in collection {collection_id}"
         )
@@ -965,7 +1167,7 @@ class TelemetryService:
     ):
         """
         Update agent runs - create if they don't exist, update if they do exist.
-        For transcripts, delete existing ones and recreate them.
+        For transcripts, upsert the new ones and delete any existing ones not among them.
         For transcript groups, upsert them with proper parent-child ordering.
         """
         # Convert AgentRun objects to SQLAlchemy objects using existing conversion functions
@@ -974,18 +1176,28 @@ class TelemetryService:
         transcript_group_data: list[SQLATranscriptGroup] = []
         agent_run_ids = [ar.id for ar in agent_runs]
 
-        # Check collection size limit
-        query = select(func.count()).where(SQLAAgentRun.collection_id == ctx.collection_id)
-        result = await self.session.execute(query)
-        existing_count = result.scalar_one()
-
-        # Count how many new agent runs we'll be adding (not updating)
-        existing_agent_run_query = select(SQLAAgentRun.id).where(
-            SQLAAgentRun.collection_id == ctx.collection_id, SQLAAgentRun.id.in_(agent_run_ids)
+        # Check collection size limit, fetching the collection's total count and the number of
+        # agent runs in this batch that don't exist yet (i.e. will be added, not updated) in one
+        # round-trip; the set difference is computed server-side so no ids are sent back
+        new_in_batch = (
+            select(func.unnest(array(agent_run_ids, type_=String(36))))
+            .except_(
+                select(SQLAAgentRun.id).where(
+                    SQLAAgentRun.collection_id == ctx.collection_id,
+                    SQLAAgentRun.id.in_(agent_run_ids),
+                )
+            )
+            .subquery("new_in_batch")
+        )
+        total_count = (
+            select(func.count())
+            .where(SQLAAgentRun.collection_id == ctx.collection_id)
+            .scalar_subquery()
         )
-        existing_agent_run_result = await self.session.execute(existing_agent_run_query)
-        existing_agent_run_ids = set(existing_agent_run_result.scalars().all())
-        new_agent_run_count = len(agent_run_ids) - len(existing_agent_run_ids)
+        result = await self.session.execute(
+            select(total_count, func.count()).select_from(new_in_batch)
+        )
+        existing_count, new_agent_run_count = result.one()
 
         if existing_count + new_agent_run_count > 100_000:
             raise ValueError("Number of agent runs in the current collection is too large")
@@ -1013,9 +1225,7 @@ class TelemetryService:
                     transcript_group_data.append(sqla_transcript_group)
 
         # Handle agent runs - upsert (insert or update)
-        for sqla_agent_run in agent_run_data:
-            # Use merge to handle both insert and update
-            await self.session.merge(sqla_agent_run)
+        await self._bulk_upsert(SQLAAgentRun, agent_run_data)
 
         # Validate transcript group parent references before saving transcript groups
         if transcript_group_data:
@@ -1027,31 +1237,95 @@ class TelemetryService:
             sorted_transcript_group_data = sort_transcript_groups_by_parent_order(
                 transcript_group_data
             )
-            for sqla_transcript_group in sorted_transcript_group_data:
-                # Use merge to handle both insert and update
-                await self.session.merge(sqla_transcript_group)
-                logger.debug(
-                    f"Saved transcript group: {sqla_transcript_group.id} with parent {sqla_transcript_group.parent_transcript_group_id}"
-                )
-        await self.session.commit()
+            await self._bulk_upsert(SQLATranscriptGroup, sorted_transcript_group_data)
+            logger.debug(f"Saved {len(sorted_transcript_group_data)} transcript groups")
 
         # Validate transcript_group_id references before inserting transcripts
         await self._validate_transcript_group_references(transcript_data, transcript_group_data)
 
-        # Handle transcripts - delete existing and recreate
-        # Delete existing transcripts for these agent runs
+        # Handle transcripts - upsert the new ones, then delete only those that disappeared,
+        # rather than deleting and re-inserting every row
+        await self._bulk_upsert(SQLATranscript, transcript_data, match_column="agent_run_id")
         delete_transcript_query = delete(SQLATranscript).where(
-            SQLATranscript.agent_run_id.in_(agent_run_ids)
+            SQLATranscript.agent_run_id.in_(agent_run_ids),
+            SQLATranscript.id.notin_([t.id for t in transcript_data]),
         )
         await self.session.execute(delete_transcript_query)
 
-        # Insert new transcripts
-        self.session.add_all(transcript_data)
-
         logger.info(
             f"Added {len(agent_runs)} agent runs, {len(transcript_data)} transcripts, and {len(transcript_group_data)} transcript groups"
         )
 
+    async def _bulk_upsert(
+        self,
+        model: type[SQLABase],
+        instances: Sequence[SQLABase],
+        match_column: str | None = None,
+    ) -> None:
+        """
+        Insert or update rows by primary key with a single INSERT ... ON CONFLICT DO UPDATE,
+        instead of a SELECT-then-write round-trip per instance as with session.merge().
+
+        Columns left unset on an instance fall back to their Python-side defaults, as they would
+        with session.add(). Existing rows keep their original created_at unless the instance
+        set one explicitly.
+
+        Args:
+            model: The SQLAlchemy model class of the instances
+            instances: Instances to upsert, in the order they should be written
+            match_column: If given, an existing row is only overwritten when this column matches
+                the incoming value, so an id collision cannot move a row to another parent
+
+        Raises:
+            ValueError: If any row was not written because it conflicted with an existing row
+                that does not match on match_column
+        """
+        if not instances:
+            return
+
+        table = cast(Table, model.__table__)
+
+        # Only send the columns each instance actually set, so SQLAlchemy applies Python-side
+        # defaults to the rest and an explicit created_at is still written. Attribute history
+        # is used rather than a None check because None can also be a deliberate value.
+        def set_columns(instance: SQLABase) -> tuple[str, ...]:
+            attrs = sqla_inspect(instance).attrs
+            return tuple(
+                column.key
+                for column in table.columns
+                if column.primary_key or attrs[column.key].history.added
+            )
+
+        written_ids: set[Any] = set()
+        rows: list[dict[str, Any]] = []
+        # Group consecutive instances rather than sorting, to preserve the write order
+        for keys, group in itertools.groupby(instances, key=set_columns):
+            group_rows = [{key: getattr(instance, key) for key in keys} for instance in group]
+            rows.extend(group_rows)
+
+            # Pass rows as executemany parameters rather than rendering them into one VALUES
+            # clause, which keeps large batches under Postgres' bind parameter limit
+            stmt = insert(table)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=list(table.primary_key.columns),
+                set_={key: stmt.excluded[key] for key in keys if not table.c[key].primary_key},
+                where=(
+                    table.c[match_column] == stmt.excluded[match_column]
+                    if match_column is not None
+                    else None
+                ),
+            ).returning(table.c.id)
+            result = await self.session.execute(stmt, group_rows)
+            written_ids.update(result.scalars().all())
+
+        # Rows whose conflict was skipped by the WHERE guard are not returned
+        skipped_ids = [row["id"] for row in rows if row["id"] not in written_ids]
+        if skipped_ids:
+            raise ValueError(
+                f"{len(skipped_ids)} {table.name} rows already exist with a different "
+                f"{match_column}: {skipped_ids}"
+            )
+
     async def _validate_transcript_group_parent_references(
         self, transcript_group_data: List[SQLATranscriptGroup]
     ) -> None:
@@ -1067,27 +1341,23 @@ class TelemetryService:
         current_group_ids = {group.id for group in transcript_group_data}
 
         # Check for parent references that don't exist in the current batch
-        invalid_parent_references: List[tuple[str, str]] = []
-        for group in transcript_group_data:
-            if (
-                group.parent_transcript_group_id
-                and group.parent_transcript_group_id not in current_group_ids
-            ):
-                invalid_parent_references.append((group.id, group.parent_transcript_group_id))
-
-        if invalid_parent_references:
+        groups_with_invalid_parent = [
+            group
+            for group in transcript_group_data
+            if group.parent_transcript_group_id
+            and group.parent_transcript_group_id not in current_group_ids
+        ]
+
+        if groups_with_invalid_parent:
             logger.warning(
-                f"Found {len(invalid_parent_references)} transcript groups with parent references not in current batch"
+                f"Found {len(groups_with_invalid_parent)} transcript groups with parent references not in current batch"
             )
             # Set parent_transcript_group_id to None for groups referencing missing parents
-            for group_id, parent_id in invalid_parent_references:
-                for group in transcript_group_data:
-                    if group.id == group_id:
-                        logger.warning(
-                            f"Removing reference to parent transcript group {parent_id} (not in current batch) from transcript group {group_id}"
-                        )
-                        group.parent_transcript_group_id = None
-                        break
+            for group in groups_with_invalid_parent:
+                logger.warning(
+                    f"Removing reference to parent transcript group {group.parent_transcript_group_id} (not in current batch) from transcript group {group.id}"
+                )
+                group.parent_transcript_group_id = None
 
     async def _validate_transcript_group_references(
         self,
@@ -1104,33 +1374,24 @@ class TelemetryService:
             transcript_group_data: List of SQLATranscriptGroup objects being added in the current batch
         """
         # Collect all unique transcript_group_ids that are not None
-        referenced_group_ids: set[str] = set()
-        for transcript in transcript_data:
-            if transcript.transcript_group_id:
-                referenced_group_ids.add(transcript.transcript_group_id)
-
-        if not referenced_group_ids:
-            return
+        referenced_group_ids = {
+            transcript.transcript_group_id
+            for transcript in transcript_data
+            if transcript.transcript_group_id
+        }
 
-        # Create a set of transcript group IDs from the current batch
+        # Groups in the current batch are valid; only the rest need to be checked in the database
         current_batch_group_ids = {group.id for group in transcript_group_data}
+        db_referenced_ids = list(referenced_group_ids - current_batch_group_ids)
+        if not db_referenced_ids:
+            return
 
-        # Check which transcript groups exist in the database (excluding those in current batch)
-        db_referenced_ids = referenced_group_ids - current_batch_group_ids
-        existing_group_ids: set[str] = set()
-
-        if db_referenced_ids:
-            query = select(SQLATranscriptGroup.id).where(
-                SQLATranscriptGroup.id.in_(list(db_referenced_ids))
-            )
-            result = await self.session.execute(query)
-            existing_group_ids = set(result.scalars().all())
-
-        # Combine existing database groups with current batch groups
-        all_valid_group_ids = existing_group_ids | current_batch_group_ids
-
-        # Find missing transcript groups
-        missing_group_ids = referenced_group_ids - all_valid_group_ids
+        # Find missing transcript groups, letting the database return only the ids it lacks
+        query = select(func.unnest(array(db_referenced_ids, type_=String(36)))).except_(
+            select(SQLATranscriptGroup.id).where(SQLATranscriptGroup.id.in_(db_referenced_ids))
+        )
+        result = await self.session.execute(query)
+        missing_group_ids = set(result.scalars().all())
 
         if missing_group_ids:
             logger.warning(
@@ -1157,25 +1418,23 @@ class TelemetryService:
         Returns:
             Organized spans structure
         """
-        organized_spans: Dict[str, Dict[str, Dict[str, List[Dict[str, Any]]]]] = {}
+        organized_spans: defaultdict[
+            str, defaultdict[str, defaultdict[str, List[Dict[str, Any]]]]
+        ] = defaultdict(lambda: defaultdict(lambda: defaultdict(list)))
 
         for span in spans:
             # Extract IDs from span attributes
-            span_attrs = span.get("attributes", {})
-            collection_id = span_attrs.get("collection_id")
-            agent_run_id = span_attrs.get("agent_run_id")
-            transcript_id = span_attrs.get("transcript_id")
+            span_attrs = span.get("attributes") or {}
+            get_attr = span_attrs.get
+            collection_id = get_attr("collection_id")
 
             if not collection_id:
-                logger.warning(
-                    f"Skipping span - missing collection_id: {self._get_span_debug_info(span)}"
-                )
-                logger.debug(f"Span: {json.dumps(span, indent=2)}")
+                logger.warning("Skipping span - missing collection_id: %s", _SpanDebugInfo(span))
                 continue
 
-            organized_spans.setdefault(collection_id, {}).setdefault(agent_run_id, {}).setdefault(
-                transcript_id, []
-            ).append(span)
+            organized_spans[collection_id][get_attr("agent_run_id")][
+                get_attr("transcript_id")
+            ].append(span)
 
         return organized_spans
 
@@ -1254,84 +1513,130 @@ class TelemetryService:
         collection_agent_runs: List[AgentRun] = []
 
         for agent_run_id, transcripts in agent_run_spans.items():
-            logger.info(f"Processing agent_run_id: {agent_run_id}")
+            logger.info("Processing agent_run_id: %s", agent_run_id)
 
-            logger.debug(
-                f"_create_agent_runs_from_spans: agent_run_id={agent_run_id}, "
-                f"num_transcripts={len(transcripts)}, "
-                f"transcript_groups_by_agent_run={len(transcript_groups_by_agent_run[agent_run_id]) if transcript_groups_by_agent_run and agent_run_id in transcript_groups_by_agent_run else 'None'}, "
-                f"collection_scores={len(collection_scores[agent_run_id]) if collection_scores and agent_run_id in collection_scores else 'None'}, "
-                f"collection_metadata={len(collection_metadata[agent_run_id]) if collection_metadata and agent_run_id in collection_metadata else 'None'}"
-            )
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(
+                    "_create_agent_runs_from_spans: agent_run_id=%s, num_transcripts=%d, "
+                    "transcript_groups_by_agent_run=%s, collection_scores=%s, collection_metadata=%s",
+                    agent_run_id,
+                    len(transcripts),
+                    (
+                        len(transcript_groups_by_agent_run[agent_run_id])
+                        if transcript_groups_by_agent_run
+                        and agent_run_id in transcript_groups_by_agent_run
+                        else None
+                    ),
+                    (
+                        len(collection_scores[agent_run_id])
+                        if collection_scores and agent_run_id in collection_scores
+                        else None
+                    ),
+                    (
+                        len(collection_metadata[agent_run_id])
+                        if collection_metadata and agent_run_id in collection_metadata
+                        else None
+                    ),
+                )
 
             agent_run_transcripts: list[Transcript] = []
             agent_run_scores: Dict[str, int | float | bool | None] = {}
             agent_run_model: str | None = None
-            agent_run_metadata_dict: Dict[str, Any] = {}
+            # Flattened span metadata grouped by top-level key; a later span's group replaces an
+            # earlier one, matching a dict.update() of each span's unflattened metadata
+            span_metadata_by_top_level_key: Dict[str, Dict[str, Any]] = {}
 
             # Process each transcript
             for transcript_id, transcript_spans in transcripts.items():
                 logger.info(
-                    f"  Processing transcript_id: {transcript_id} with {len(transcript_spans)} spans"
+                    "  Processing transcript_id: %s with %d spans",
+                    transcript_id,
+                    len(transcript_spans),
                 )
 
-                # Debug: Log span details to understand what's in the spans
-                for i, span in enumerate(transcript_spans):
-                    span_attrs = span.get("attributes", {})
-                    logger.debug(f"    Span {i}: attributes={list(span_attrs.keys())}")
-
-                # Extract metadata and scores from spans
+                # Extract scores, metadata, and model from spans in a single pass
                 for span in transcript_spans:
-                    # Check for agent_run_score events
-                    for event in span.get("events", []):
-                        if event.get("name") == "agent_run_score":
-                            score_name = event.get("attributes", {}).get("score.name")
-                            score_value = event.get("attributes", {}).get("score.value")
+                    span_attrs = span.get("attributes") or {}
+
+                    # Check for agent_run_score events, noting whether there are metadata events
+                    has_metadata_event = False
+                    for event in span.get("events") or ():
+                        event_name = event.get("name")
+                        if event_name == "agent_run_score":
+                            event_attrs = event.get("attributes") or {}
+                            score_name = event_attrs.get("score.name")
+                            score_value = event_attrs.get("score.value")
                             if score_name and score_value is not None:
                                 agent_run_scores[score_name] = score_value
-                                logger.info(f"    Found score: {score_name} = {score_value}")
+                                logger.info("    Found score: %s = %s", score_name, score_value)
+                        elif event_name == "agent_run_metadata":
+                            has_metadata_event = True
 
                     # Extract metadata from span events
-                    span_metadata = self._extract_metadata_from_span_events(span)
-                    if span_metadata:
-                        # Unflatten the metadata to restore nested structure
-                        unflattened_metadata = self._unflatten_metadata(span_metadata)
-                        agent_run_metadata_dict.update(unflattened_metadata)
-                        logger.info(f"    Found metadata: {unflattened_metadata}")
-
-                    # Extract model from span attributes
-                    span_attrs = span.get("attributes", {})
+                    if has_metadata_event:
+                        span_metadata = self._extract_metadata_from_span_events(span)
+                        if span_metadata:
+                            span_groups: Dict[str, Dict[str, Any]] = {}
+                            for key, value in span_metadata.items():
+                                span_groups.setdefault(key.split(".", 1)[0], {})[key] = value
+                            span_metadata_by_top_level_key.update(span_groups)
+                            logger.info("    Found metadata: %s", span_metadata)
+
+                    # Extract model from span attributes; the first one found wins
                     if not agent_run_model and "gen_ai.response.model" in span_attrs:
                         llm_request_type = (
                             span_attrs.get("llm", {}).get("request", {}).get("type", None)
                         )
                         if llm_request_type != "embedding":
                             agent_run_model = span_attrs["gen_ai.response.model"]
-                            logger.info(f"    Found model: {agent_run_model}")
+                            logger.info("    Found model: %s", agent_run_model)
 
                 # Create transcripts from spans
                 transcripts_list = self._create_transcripts_from_spans(transcript_spans)
                 logger.debug(
-                    f"    Created {len(transcripts_list)} transcripts from {len(transcript_spans)} spans"
+                    "    Created %d transcripts from %d spans",
+                    len(transcripts_list),
+                    len(transcript_spans),
                 )
 
                 if not transcripts_list:
                     logger.warning(
-                        f"    No transcripts created from {len(transcript_spans)} spans for transcript_id: {transcript_id}"
+                        "    No transcripts created from %d spans for transcript_id: %s",
+                        len(transcript_spans),
+                        transcript_id,
                     )
-                    # Log more details about why no transcripts were created
-                    for i, span in enumerate(transcript_spans):
-                        span_attrs = span.get("attributes", {})
-                        gen_ai_keys = [k for k in span_attrs.keys() if k.startswith("gen_ai")]
-                        logger.debug(f"      Span {i} gen_ai keys: {gen_ai_keys}")
-                        if not gen_ai_keys:
-                            logger.debug(
-                                f"      Span {i} has no gen_ai keys. All keys: {list(span_attrs.keys())}"
+                    # Log a summary of the span attributes to help explain why
+                    if logger.isEnabledFor(logging.DEBUG):
+                        attribute_prefix_counts = Counter(
+                            key.split(".", 1)[0]
+                            for span in transcript_spans
+                            for key in span.get("attributes") or {}
+                        )
+                        spans_without_gen_ai = [
+                            i
+                            for i, span in enumerate(transcript_spans)
+                            if not any(
+                                key.startswith("gen_ai") for key in span.get("attributes") or {}
                             )
+                        ]
+                        logger.debug(
+                            "      Attribute key prefix counts: %s; spans with no gen_ai keys: %s",
+                            dict(attribute_prefix_counts),
+                            spans_without_gen_ai,
+                        )
 
                 # Add transcripts to agent run
                 agent_run_transcripts.extend(transcripts_list)
 
+            # Unflatten the metadata once to restore nested structure
+            agent_run_metadata_dict = self._unflatten_metadata(
+                {
+                    key: value
+                    for group in span_metadata_by_top_level_key.values()
+                    for key, value in group.items()
+                }
+            )
+
             # Create agent run if it has transcripts
             if agent_run_transcripts:
                 # Create metadata with scores, model, and any additional metadata using BaseAgentRunMetadata
@@ -1342,7 +1647,7 @@ class TelemetryService:
                 # Add any additional metadata from span events
                 if agent_run_metadata_dict:
                     metadata_dict.update(agent_run_metadata_dict)
-                    logger.info(f"  Added metadata to agent run: {agent_run_metadata_dict}")
+                    logger.info("  Added metadata to agent run: %s", agent_run_metadata_dict)
 
                 # Add stored scores (these take precedence over span-based scores)
                 if collection_scores and collection_scores.get(agent_run_id):
@@ -1353,7 +1658,9 @@ class TelemetryService:
                             # Add the stored score to the scores dict
                             metadata_dict["scores"][stored_score_name] = stored_score_value
                             logger.info(
-                                f"  Added stored score to agent run: {stored_score_name} = {stored_score_value}"
+                                "  Added stored score to agent run: %s = %s",
+                                stored_score_name,
+                                stored_score_value,
                             )
 
                 # Add stored metadata (these take precedence over span-based metadata)
@@ -1363,7 +1670,7 @@ class TelemetryService:
                         if stored_metadata:
                             # Merge stored metadata with span-based metadata, stored metadata takes precedence
                             metadata_dict.update(stored_metadata)
-                            logger.info(f"  Added stored metadata to agent run: {stored_metadata}")
+                            logger.info("  Added stored metadata to agent run: %s", stored_metadata)
 
                 metadata = metadata_dict
 
@@ -1407,87 +1714,138 @@ class TelemetryService:
         """
         # Store all the chat threads and track which spans contributed to each
         chat_threads: List[List[ChatMessage]] = []
-        thread_span_indices: List[List[int]] = []  # Track which spans contributed to each thread
+        # Track the last span that contributed to each thread; only it decides the transcript group
+        thread_last_span_indices: List[int] = []
+        # Index threads by the keys of their first message so only plausible matches are checked
+        thread_head_index: Dict[Hashable | None, List[int]] = defaultdict(list)
+        # Tool call ids in each thread, kept up to date as threads grow
+        thread_tool_call_ids: List[set[str]] = []
+        # Positions of empty tool call results in each thread, by tool_call_id
+        thread_empty_tool_results: List[Dict[str, List[int]]] = []
+        # Message fingerprints, computed once per message for all the comparisons it takes part in
+        message_fingerprints: Dict[int, tuple[ChatMessage, MessageFingerprint]] = {}
+        # Remember how many messages each span produced, so diagnostics don't re-parse spans
+        span_message_counts: List[int] = []
 
         for span_idx, span in enumerate(transcript_spans):
             # Extract messages from this span
             span_messages = self._span_to_chat_messages(span)
+            span_message_counts.append(len(span_messages))
 
             if not span_messages:
                 continue
 
             # Find or create chat thread
-            thread_index, action = self._find_or_create_chat_thread(span_messages, chat_threads)
+            thread_index, action = self._find_or_create_chat_thread(
+                span_messages,
+                chat_threads,
+                thread_head_index,
+                thread_tool_call_ids,
+                message_fingerprints,
+            )
 
             if action == "new":
                 # Create new chat thread
+                for key in _chat_thread_head_keys(span_messages[0]):
+                    thread_head_index[key].append(len(chat_threads))
                 chat_threads.append(span_messages)
-                thread_span_indices.append([span_idx])
-                logger.debug(f"    Created new chat thread with {len(span_messages)} messages")
+                thread_last_span_indices.append(span_idx)
+                thread_tool_call_ids.append(
+                    self._collect_all_tool_call_ids_from_thread(span_messages)
+                )
+                empty_tool_results: Dict[str, List[int]] = {}
+                self._index_empty_tool_call_results(span_messages, empty_tool_results)
+                thread_empty_tool_results.append(empty_tool_results)
+                logger.debug("    Created new chat thread with %d messages", len(span_messages))
             elif action == "extend" and thread_index is not None:
                 # Found matching thread - add new messages
                 existing_thread = chat_threads[thread_index]
-                new_messages = span_messages[len(existing_thread) :]
+                new_messages_start = len(existing_thread)
+                new_messages = span_messages[new_messages_start:]
 
-                # Update empty tool call results in existing thread with new results
-                self._update_empty_tool_call_results(existing_thread, span_messages)
+                # Update empty tool call results in existing thread with new results. This needs
+                # all of span_messages: a filled-in result may sit in the overlapping prefix.
+                self._update_empty_tool_call_results(
+                    existing_thread, span_messages, thread_empty_tool_results[thread_index]
+                )
 
-                chat_threads[thread_index].extend(new_messages)
-                thread_span_indices[thread_index].append(span_idx)
-                logger.debug(
-                    f"    Extended chat thread {thread_index} with {len(new_messages)} new messages. First new message: {new_messages[0].text[:100].replace('\n', ' ') if new_messages else 'N/A'}"
+                existing_thread.extend(new_messages)
+                self._index_empty_tool_call_results(
+                    existing_thread, thread_empty_tool_results[thread_index], new_messages_start
+                )
+                thread_last_span_indices[thread_index] = span_idx
+                thread_tool_call_ids[thread_index] |= self._collect_all_tool_call_ids_from_thread(
+                    new_messages
                 )
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug(
+                        "    Extended chat thread %d with %d new messages. First new message: %s",
+                        thread_index,
+                        len(new_messages),
+                        new_messages[0].text[:100].replace("\n", " ") if new_messages else "N/A",
+                    )
             elif action == "skip":
                 # New messages are already contained in existing thread - skip
                 logger.debug(
-                    f"    Skipped span with {len(span_messages)} messages (already contained in thread {thread_index})"
+                    "    Skipped span with %d messages (already contained in thread %s)",
+                    len(span_messages),
+                    thread_index,
                 )
 
         # Create transcripts from chat threads
         transcripts: List[Transcript] = []
         logger.debug(
-            f"    Created {len(chat_threads)} chat threads from {len(transcript_spans)} spans"
+            "    Created %d chat threads from %d spans", len(chat_threads), len(transcript_spans)
         )
 
         if chat_threads:
+            name_threads = len(chat_threads) > 1
+            # Draw the randomness for all transcript IDs at once instead of once per thread
+            id_bytes = os.urandom(16 * len(chat_threads))
             for i, chat_thread in enumerate(chat_threads):
                 # Create unique transcript ID for each thread
-                thread_transcript_id = str(uuid.uuid4())
+                thread_transcript_id = str(
+                    uuid.UUID(bytes=id_bytes[16 * i : 16 * (i + 1)], version=4)
+                )
 
-                # Determine transcript_group_id for this thread based on contributing spans
-                thread_transcript_group_id = None
-                if thread_span_indices[i]:
-                    # Use the transcript_group_id from the last span that contributed to this thread
-                    last_contributing_span_idx = thread_span_indices[i][-1]
-                    last_contributing_span = transcript_spans[last_contributing_span_idx]
-                    last_span_attrs = last_contributing_span.get("attributes", {})
-                    thread_transcript_group_id = last_span_attrs.get("transcript_group_id")
+                # Use the transcript_group_id from the last span that contributed to this thread
+                last_contributing_span = transcript_spans[thread_last_span_indices[i]]
+                last_span_attrs = last_contributing_span.get("attributes", {})
+                thread_transcript_group_id = last_span_attrs.get("transcript_group_id")
 
                 transcript = Transcript(
                     id=thread_transcript_id,
                     messages=chat_thread,
-                    name=f"Chat Thread {i + 1}" if len(chat_threads) > 1 else "",
+                    name=f"Chat Thread {i + 1}" if name_threads else "",
                     description="",
                     transcript_group_id=thread_transcript_group_id,
                 )
                 transcripts.append(transcript)
                 logger.info(
-                    f"    Created transcript {thread_transcript_id} with {len(chat_thread)} messages and transcript_group_id: {thread_transcript_group_id}"
+                    "    Created transcript %s with %d messages and transcript_group_id: %s",
+                    thread_transcript_id,
+                    len(chat_thread),
+                    thread_transcript_group_id,
                 )
         else:
             logger.warning(f"    No messages extracted from {len(transcript_spans)} spans")
             # Log more details about why no chat threads were created
-            total_messages = 0
-            for span_idx, span in enumerate(transcript_spans):
-                span_messages = self._span_to_chat_messages(span)
-                total_messages += len(span_messages)
-                logger.debug(f"      Span {span_idx}: extracted {len(span_messages)} messages")
-            logger.debug(f"    Total messages extracted from all spans: {total_messages}")
+            if logger.isEnabledFor(logging.DEBUG):
+                for span_idx, message_count in enumerate(span_message_counts):
+                    logger.debug("      Span %d: extracted %d messages", span_idx, message_count)
+                logger.debug(
+                    "    Total messages extracted from all spans: %d", sum(span_message_counts)
+                )
 
         return transcripts
 
     def _find_or_create_chat_thread(
-        self, span_messages: List[ChatMessage], existing_chat_threads: List[List[ChatMessage]]
+        self,
+        span_messages: List[ChatMessage],
+        existing_chat_threads: List[List[ChatMessage]],
+        thread_head_index: Dict[Hashable | None, List[int]] | None = None,
+        thread_tool_call_ids: List[set[str]] | None = None,
+        message_fingerprints: Dict[int, tuple[ChatMessage, MessageFingerprint]] | None = None,
     ) -> tuple[int | None, str]:
         """
         Find the right existing chat thread to add new messages to, or indicate a new thread should be created.
@@ -1495,6 +1853,13 @@ class TelemetryService:
         Args:
             span_messages: Messages from the current span
             existing_chat_threads: List of existing chat threads
+            thread_head_index: Optional map from _chat_thread_head_keys of each thread's first
+                message to thread indices. When given, only threads whose first message can
+                match the span's first message are checked, instead of every thread.
+            thread_tool_call_ids: Optional tool call ids of each existing thread, so they
+                aren't recollected for every comparison
+            message_fingerprints: Optional fingerprint cache shared across calls, passed on to
+                matching_thread_start
 
         Returns:
             Tuple of (thread_index, action) where action is 'extend', 'skip', or 'new'
@@ -1503,21 +1868,54 @@ class TelemetryService:
             # Single message - create new chat thread
             return None, "new"
 
-        # Multiple messages - try to find matching existing thread
-        for i, existing_thread in enumerate(existing_chat_threads):
+        head_keys = _chat_thread_head_keys(span_messages[0])
+        if thread_head_index is None or None in head_keys:
+            candidate_indices: Iterable[int] = range(len(existing_chat_threads))
+        else:
+            candidate_indices = sorted(
+                {i for key in (*head_keys, None) for i in thread_head_index.get(key, ())}
+            )
+        span_tool_call_ids = self._collect_all_tool_call_ids_from_thread(span_messages)
+
+        # Multiple messages - try to find matching existing thread. Candidates are checked in
+        # creation order: when several threads match, the earliest one wins, so scanning from
+        # the most recent thread would change which thread the span joins.
+        for i in candidate_indices:
+            existing_thread = existing_chat_threads[i]
+            existing_tool_call_ids = (
+                thread_tool_call_ids[i]
+                if thread_tool_call_ids is not None
+                else self._collect_all_tool_call_ids_from_thread(existing_thread)
+            )
             # Case 1: Check if existing thread is a prefix of span_messages (extend existing)
             if len(span_messages) > len(existing_thread):
-                if self.matching_thread_start(existing_thread, span_messages):
+                if self.matching_thread_start(
+                    existing_thread,
+                    span_messages,
+                    existing_tool_call_ids,
+                    span_tool_call_ids,
+                    message_fingerprints,
+                ):
                     logger.debug(
-                        f"    Found matching thread {i} for span with {len(span_messages)} messages (extend existing)"
+                        "    Found matching thread %d for span with %d messages (extend existing)",
+                        i,
+                        len(span_messages),
                     )
                     return i, "extend"
 
             # Case 2: Check if span_messages is a prefix of existing thread (skip new)
             elif len(existing_thread) >= len(span_messages):
-                if self.matching_thread_start(span_messages, existing_thread):
+                if self.matching_thread_start(
+                    span_messages,
+                    existing_thread,
+                    span_tool_call_ids,
+                    existing_tool_call_ids,
+                    message_fingerprints,
+                ):
                     logger.debug(
-                        f"    Found matching thread {i} for span with {len(span_messages)} messages (skip new - already contained)"
+                        "    Found matching thread %d for span with %d messages (skip new - already contained)",
+                        i,
+                        len(span_messages),
                     )
                     return i, "skip"
 
@@ -1525,7 +1923,12 @@ class TelemetryService:
         return None, "new"
 
     def matching_thread_start(
-        self, existing_thread: List[ChatMessage], new_thread: List[ChatMessage]
+        self,
+        existing_thread: List[ChatMessage],
+        new_thread: List[ChatMessage],
+        existing_thread_tool_call_ids: set[str] | None = None,
+        new_thread_tool_call_ids: set[str] | None = None,
+        message_fingerprints: Dict[int, tuple[ChatMessage, MessageFingerprint]] | None = None,
     ) -> bool:
         """Check if the beginning of new_thread matches the existing_thread.
 
@@ -1535,6 +1938,10 @@ class TelemetryService:
         Args:
             existing_thread: The existing chat thread to match against
             new_thread: The new chat thread to check
+            existing_thread_tool_call_ids: Precomputed tool call ids of existing_thread, if known
+            new_thread_tool_call_ids: Precomputed tool call ids of new_thread, if known
+            message_fingerprints: Optional cache of message fingerprints, so each message's
+                text is fingerprinted once across repeated matching calls
 
         Returns:
             True if the beginning of new_thread matches existing_thread, False otherwise
@@ -1542,19 +1949,46 @@ class TelemetryService:
         if not existing_thread or not new_thread:
             return False
 
-        # First, collect all tool call IDs from both threads
-        existing_thread_tool_call_ids = self._collect_all_tool_call_ids_from_thread(existing_thread)
-        new_thread_tool_call_ids = self._collect_all_tool_call_ids_from_thread(new_thread)
+        # Fast path: consume the leading run of directly matching messages, exactly as the loop
+        # below would. A plain extension of existing_thread is fully matched here, without
+        # collecting tool call IDs or entering the reconciliation logic.
+        matched = 0
+        max_matched = min(len(existing_thread), len(new_thread))
+        while matched < max_matched:
+            existing_msg = existing_thread[matched]
+            new_msg = new_thread[matched]
+            if (
+                _message_fingerprint(existing_msg, message_fingerprints)
+                != _message_fingerprint(new_msg, message_fingerprints)
+                or existing_msg.text != new_msg.text
+            ):
+                break
+            matched += 1
+        if matched == len(existing_thread):
+            return True
+
+        # Collect all tool call IDs from both threads unless the caller already has them
+        if existing_thread_tool_call_ids is None:
+            existing_thread_tool_call_ids = self._collect_all_tool_call_ids_from_thread(
+                existing_thread
+            )
+        if new_thread_tool_call_ids is None:
+            new_thread_tool_call_ids = self._collect_all_tool_call_ids_from_thread(new_thread)
 
-        existing_idx = 0
-        new_idx = 0
+        existing_idx = matched
+        new_idx = matched
 
         while existing_idx < len(existing_thread) and new_idx < len(new_thread):
             existing_msg = existing_thread[existing_idx]
             new_msg = new_thread[new_idx]
 
-            # Check if messages match directly (same role and content)
-            if existing_msg.role == new_msg.role and existing_msg.text == new_msg.text:
+            # Check if messages match directly (same role and content), comparing fingerprints
+            # first so that only likely matches pay for a full text comparison
+            if (
+                _message_fingerprint(existing_msg, message_fingerprints)
+                == _message_fingerprint(new_msg, message_fingerprints)
+                and existing_msg.text == new_msg.text
+            ):
                 existing_idx += 1
                 new_idx += 1
                 continue
@@ -1600,10 +2034,16 @@ class TelemetryService:
 
             # If we get here, the messages don't match and can't be reconciled
             logger.debug(
-                f"Thread matching failed: messages don't match at positions "
-                f"existing_idx={existing_idx}, new_idx={new_idx}. "
-                f"Existing message: role='{existing_msg.role}', text='{existing_msg.text[:50]}...' "
-                f"New message: role='{new_msg.role}', text='{new_msg.text[:50]}...'"
+                "Thread matching failed: messages don't match at positions "
+                "existing_idx=%d, new_idx=%d. "
+                "Existing message: role='%s', text='%.50s...' "
+                "New message: role='%s', text='%.50s...'",
+                existing_idx,
+                new_idx,
+                existing_msg.role,
+                existing_msg.text,
+                new_msg.role,
+                new_msg.text,
             )
             return False
 
@@ -1611,9 +2051,12 @@ class TelemetryService:
         result = existing_idx >= len(existing_thread)
         if not result:
             logger.debug(
-                f"Thread matching failed: didn't process all of existing thread. "
-                f"Processed {existing_idx}/{len(existing_thread)} existing messages, "
-                f"processed {new_idx}/{len(new_thread)} new messages"
+                "Thread matching failed: didn't process all of existing thread. "
+                "Processed %d/%d existing messages, processed %d/%d new messages",
+                existing_idx,
+                len(existing_thread),
+                new_idx,
+                len(new_thread),
             )
         return result
 
@@ -1661,8 +2104,30 @@ class TelemetryService:
 
         return tool_call_ids
 
+    def _index_empty_tool_call_results(
+        self,
+        thread: List[ChatMessage],
+        empty_tool_results: Dict[str, List[int]],
+        start: int = 0,
+    ) -> None:
+        """Record the positions of empty tool call results in thread[start:].
+
+        Args:
+            thread: The chat thread to scan
+            empty_tool_results: Map from tool_call_id to ascending message indices, updated in place
+            start: Index of the first message to scan
+        """
+        for i in range(start, len(thread)):
+            msg = thread[i]
+            if msg.role == "tool" and msg.tool_call_id and (not msg.text or msg.text.strip() == ""):
+                empty_tool_results.setdefault(msg.tool_call_id, []).append(i)
+                logger.debug("Found empty tool result for tool_call_id: %s", msg.tool_call_id)
+
     def _update_empty_tool_call_results(
-        self, existing_thread: List[ChatMessage], new_messages: List[ChatMessage]
+        self,
+        existing_thread: List[ChatMessage],
+        new_messages: List[ChatMessage],
+        empty_tool_results: Dict[str, List[int]] | None = None,
     ) -> None:
         """Update empty tool call results in existing thread with new results.
 
@@ -1673,18 +2138,19 @@ class TelemetryService:
         Args:
             existing_thread: The existing chat thread that may have empty tool call results
             new_messages: The new messages that may contain updated tool call results
+            empty_tool_results: Optional index of existing_thread's empty tool call results, as
+                built by _index_empty_tool_call_results. It is kept up to date as results are
+                filled in, so callers can reuse it instead of rescanning the thread each time.
         """
-        # Find empty tool call results in existing thread
-        empty_tool_results: Dict[str, int] = {}  # tool_call_id -> message_index
-        for i, msg in enumerate(existing_thread):
-            if msg.role == "tool" and msg.tool_call_id and (not msg.text or msg.text.strip() == ""):
-                empty_tool_results[msg.tool_call_id] = i
-                logger.debug(f"Found empty tool result for tool_call_id: {msg.tool_call_id}")
+        if empty_tool_results is None:
+            empty_tool_results = {}
+            self._index_empty_tool_call_results(existing_thread, empty_tool_results)
 
         if not empty_tool_results:
             return
 
         # Find corresponding non-empty tool call results in new messages
+        updated_tool_call_ids: set[str] = set()
         for msg in new_messages:
             if (
                 msg.role == "tool"
@@ -1694,8 +2160,8 @@ class TelemetryService:
                 and msg.text.strip() != ""
             ):
 
-                # Update the existing empty tool result with the new content
-                existing_msg_index = empty_tool_results[msg.tool_call_id]
+                # Update the last empty tool result with this id with the new content
+                existing_msg_index = empty_tool_results[msg.tool_call_id][-1]
 
                 # Create updated message with new content
                 updated_msg = ToolMessage(
@@ -1707,74 +2173,74 @@ class TelemetryService:
 
                 # Replace the existing message
                 existing_thread[existing_msg_index] = updated_msg
+                updated_tool_call_ids.add(msg.tool_call_id)
                 logger.info(
-                    f"Updated empty tool result for tool_call_id {msg.tool_call_id} "
-                    f"with content: {msg.text[:100]}..."
+                    "Updated empty tool result for tool_call_id %s with content: %.100s...",
+                    msg.tool_call_id,
+                    msg.text,
                 )
 
+        # The replaced results are no longer empty
+        for tool_call_id in updated_tool_call_ids:
+            positions = empty_tool_results[tool_call_id]
+            positions.pop()
+            if not positions:
+                del empty_tool_results[tool_call_id]
+
     def _span_to_chat_messages(self, span: Dict[str, Any]) -> List[ChatMessage]:
         """Convert a span to a list of chat message objects."""
         span_attrs = span.get("attributes", {})
-        messages: List[ChatMessage] = []
+        # Only build span details for debug logs when they will be emitted
+        debug_enabled = logger.isEnabledFor(logging.DEBUG)
 
-        # Debug logging
-        logger.debug(
-            f"Processing span with {len(span_attrs)} attributes: {self._get_span_debug_info(span)}"
-        )
+        if debug_enabled:
+            logger.debug(
+                "Processing span with %d attributes: %s",
+                len(span_attrs),
+                _SpanDebugInfo(span),
+            )
 
         # Check for embedding request type
         llm_request_type = span_attrs.get("llm.request.type")
         if llm_request_type == "embedding":
-            logger.info(f"Skipping embedding span: {self._get_span_debug_info(span)}")
+            logger.info("Skipping embedding span: %s", _SpanDebugInfo(span))
             return []
 
         messages = self._extract_messages_from_span(span)
 
+        if not debug_enabled:
+            return messages
+
         # Debug logging
         if messages:
             logger.debug(
-                f"Extracted {len(messages)} messages from span: {self._get_span_debug_info(span)}"
+                "Extracted %d messages from span: %s",
+                len(messages),
+                _SpanDebugInfo(span),
             )
             for i, msg in enumerate(messages):
                 logger.debug(
-                    f"  Message {i}: role={msg.role}, content_length={len(msg.text) if hasattr(msg, 'text') else 'N/A'}"
+                    "  Message %d: role=%s, content_length=%s",
+                    i,
+                    msg.role,
+                    len(msg.text) if hasattr(msg, "text") else "N/A",
                 )
         else:
-            logger.debug(f"No messages extracted from span: {self._get_span_debug_info(span)}")
+            logger.debug("No messages extracted from span: %s", _SpanDebugInfo(span))
             # Additional debugging to understand why no messages were extracted
-            span_attrs = span.get("attributes", {})
             gen_ai_keys = [k for k in span_attrs.keys() if k.startswith("gen_ai")]
             if gen_ai_keys:
-                logger.debug(f"  Span has gen_ai keys: {gen_ai_keys}")
+                logger.debug("  Span has gen_ai keys: %s", gen_ai_keys)
             else:
-                logger.debug(
-                    f"  Span has no gen_ai keys. Available keys: {list(span_attrs.keys())}"
-                )
+                logger.debug("  Span has no gen_ai keys. Available keys: %s", list(span_attrs))
 
         return messages
 
-    def _get_span_debug_info(self, span: Dict[str, Any]) -> str:
-        """
-        Generate helpful debugging information from a span for logging purposes.
-
-        Args:
-            span: The span dictionary
-
-        Returns:
-            String with key identifiers for easy log searching
+    def _reformat_gen_ai_attributes(
+        self, span_attrs: Dict[str, Any]
+    ) -> Dict[str, Dict[int, Dict[str, Any]]]:
         """
-        span_attrs = span.get("attributes", {})
-        collection_id = span_attrs.get("collection_id", "unknown")
-        agent_run_id = span_attrs.get("agent_run_id", "unknown")
-        transcript_group_id = span_attrs.get("transcript_group_id", "unknown")
-        transcript_id = span_attrs.get("transcript_id", "unknown")
-        raw_span_id = span.get("raw_span_id", span.get("span_id", "unknown"))
-
-        return f"collection_id={collection_id}, agent_run_id={agent_run_id}, transcript_group_id={transcript_group_id}, transcript_id={transcript_id}, span_id={raw_span_id}"
-
-    def _reformat_gen_ai_attributes(self, span_attrs: Dict[str, Any]) -> Dict[str, Any]:
-        """
-        Reformat gen_ai attributes from flat key-value pairs to structured dictionary.
+        Group flat gen_ai prompt and completion attributes by section and message index.
 
         Example:
         Input: {
@@ -1784,123 +2250,98 @@ class TelemetryService:
             'gen_ai.prompt.1.content': 'Hi there',
             'gen_ai.completion.0.role': 'assistant',
             'gen_ai.completion.0.content': 'How can I help?',
-            'gen_ai.tool_calls.0.0.id': 'call_1',
-            'gen_ai.tool_calls.0.1.id': 'call_2'
+            'gen_ai.completion.0.tool_calls.0.id': 'call_1',
+            'gen_ai.completion.0.tool_calls.1.id': 'call_2'
         }
 
         Output: {
-            'gen_ai': {
-                'prompt': {
-                    '0': {'role': 'user', 'content': 'Hello'},
-                    '1': {'role': 'assistant', 'content': 'Hi there'}
-                },
-                'completion': {
-                    '0': {'role': 'assistant', 'content': 'How can I help?'}
-                },
-                'tool_calls': {
-                    '0': {
+            'prompt': {
+                0: {'role': 'user', 'content': 'Hello'},
+                1: {'role': 'assistant', 'content': 'Hi there'}
+            },
+            'completion': {
+                0: {
+                    'role': 'assistant',
+                    'content': 'How can I help?',
+                    'tool_calls': {
                         '0': {'id': 'call_1'},
                         '1': {'id': 'call_2'}
                     }
                 }
             }
         }
+
+        Fields below the message index keep their nested structure. Other gen_ai attributes and
+        non-integer message indices are skipped here, so callers can iterate indices directly.
         """
-        gen_ai_data: Dict[str, Any] = {}
+        sections: Dict[str, Dict[int, Dict[str, Any]]] = {}
 
         for key, value in span_attrs.items():
             if not key.startswith("gen_ai."):
                 continue
 
-            # Split the key into parts: gen_ai.prompt.0.role -> ['gen_ai', 'prompt', '0', 'role']
-            parts = key.split(".")
-            if len(parts) < 2:  # Need at least gen_ai.something
-                logger.warning(f"Invalid gen_ai attribute: {key} with value: {value}")
+            # gen_ai.completion.0.tool_calls.0.id -> ['gen_ai', 'completion', '0', 'tool_calls.0.id']
+            parts = key.split(".", 3)
+            if len(parts) < 4 or parts[1] not in ("prompt", "completion"):
+                continue
+            if not parts[2].isdecimal():
+                logger.debug("Skipping non-digit key: %s", parts[2])
                 continue
 
-            # Navigate/create the nested structure
-            current: Dict[str, Any] = gen_ai_data
-            if "gen_ai" not in current:
-                current["gen_ai"] = {}
-            current = current["gen_ai"]  # type: ignore
-
-            # Build up the nested structure
-            for part in parts[1:-1]:
-                if part not in current:
-                    current[part] = {}
-                current = current[part]  # type: ignore
-
-            # Store the value at the final location
-            current[parts[-1]] = value
+            current = sections.setdefault(parts[1], {}).setdefault(int(parts[2]), {})
+            *path, field = parts[3].split(".")
+            for part in path:
+                current = current.setdefault(part, {})
+            current[field] = value
 
-        return gen_ai_data
+        return sections
 
     def _extract_messages_from_span(self, span: Dict[str, Any]) -> List[ChatMessage]:
         """Extract ChatMessage objects from structured gen_ai data."""
         messages: List[ChatMessage] = []
         span_attrs = span.get("attributes", {})
-        gen_ai_data = self._reformat_gen_ai_attributes(span_attrs)
+        gen_ai = self._reformat_gen_ai_attributes(span_attrs)
 
-        if "gen_ai" not in gen_ai_data:
-            logger.debug(
-                f"No gen_ai data found in span. Available keys: {list(gen_ai_data.keys())}"
-            )
+        if not gen_ai:
+            logger.debug("No gen_ai prompt or completion data found in span")
             return messages
 
-        gen_ai = gen_ai_data["gen_ai"]
-
-        # Process prompt messages
-        if "prompt" in gen_ai:
-            # Sort keys numerically to maintain proper order
-            for key in sorted(
-                gen_ai["prompt"].keys(), key=lambda k: (0, int(k)) if k.isdigit() else (1, k)
-            ):
-                # Skip keys that aren't digits
-                if not key.isdigit():
-                    logger.info(f"Skipping non-digit key: {key}")
-                    continue
-
-                prompt_data: dict[str, Any] = gen_ai["prompt"][key]
-
-                message = self._create_message_from_data(prompt_data, span, f"prompt_{key}")
-                if message:
-                    messages.append(message)
+        # Process prompt messages in index order
+        prompt = gen_ai.get("prompt", {})
+        for index in sorted(prompt):
+            message = self._create_message_from_data(prompt[index], span, f"prompt_{index}")
+            if message:
+                messages.append(message)
 
-        # Process completion messages
+        # Process completion messages in index order
         fields_moved_from_previous_key = {}
-        if "completion" in gen_ai:
-            # Sort keys numerically to maintain proper order
-            for key in sorted(
-                gen_ai["completion"].keys(), key=lambda k: (0, int(k)) if k.isdigit() else (1, k)
-            ):
-                # Skip keys that aren't digits
-                if not key.isdigit():
-                    logger.info(f"Skipping non-digit key: {key}")
-                    continue
-
-                # openllmetry anthropic instrumentation handles thinking blocks by changing the role to "thinking" and then incrementing the key used for subsequent blocks
-                # https://github.com/traceloop/openllmetry/blob/84f5ee346baa5f7bc323f03b58f19167c87c6062/packages/opentelemetry-instrumentation-anthropic/opentelemetry/instrumentation/anthropic/span_utils.py#L193-L214
-                if (
-                    "role" in gen_ai["completion"][key]
-                    and gen_ai["completion"][key]["role"] == "thinking"
-                ):
-                    # Use this in the next iteration of the loop
-                    fields_moved_from_previous_key = {
-                        "reasoning": gen_ai["completion"][key]["content"],
-                    }
-                    continue
+        completion = gen_ai.get("completion", {})
+        for index in sorted(completion):
+            completion_fields = completion[index]
+
+            # openllmetry anthropic instrumentation handles thinking blocks by changing the role to "thinking" and then incrementing the key used for subsequent blocks
+            # https://github.com/traceloop/openllmetry/blob/84f5ee346baa5f7bc323f03b58f19167c87c6062/packages/opentelemetry-instrumentation-anthropic/opentelemetry/instrumentation/anthropic/span_utils.py#L193-L214
+            if completion_fields.get("role") == "thinking":
+                # Use this in the next iteration of the loop
+                fields_moved_from_previous_key = {
+                    "reasoning": completion_fields["content"],
+                }
+                continue
 
-                completion_data: dict[str, Any] = (
-                    gen_ai["completion"][key] | fields_moved_from_previous_key
-                )
+            # Only copy the fields when there is something to merge into them
+            completion_data: dict[str, Any] = (
+                completion_fields | fields_moved_from_previous_key
+                if fields_moved_from_previous_key
+                else completion_fields
+            )
 
-                message = self._create_message_from_data(
-                    completion_data, span, f"completion_{key}", assume_role="assistant"
-                )
-                # Reset this, since if it was used it should not be used again
-                fields_moved_from_previous_key = {}
-                if message:
-                    messages.append(message)
+            message = self._create_message_from_data(
+                completion_data, span, f"completion_{index}", assume_role="assistant"
+            )
+            # Reset this, since if it was used it should not be used again
+            fields_moved_from_previous_key = {}
+            if message:
+                messages.append(message)
 
         return messages
 
@@ -1916,70 +2357,66 @@ class TelemetryService:
         try:
             # Determine role
             if "role" in data:
-                role = str(data["role"])
+                role = _intern_short(str(data["role"]))
                 if role == "developer":
                     role = "system"
             elif assume_role:
                 role = assume_role
-            elif "user" in data:
-                role = "user"
-            elif "assistant" in data:
-                role = "assistant"
-            elif "system" in data:
-                role = "system"
-            elif "developer" in data:
-                role = "system"
             else:
-                logger.error(
-                    f"No valid role found in {context} for span {raw_span_id}. Available keys: {list(data.keys())}"
-                )
-                return None
-
-            # Build content from available fields
-            content_parts: List[Content] = []
-
-            # Add reasoning if present
-            if "reasoning" in data:
-                reasoning = data["reasoning"]
-                if isinstance(reasoning, str):
-                    reasoning = [reasoning]
-                for reasoning_item in reasoning:
-                    content_parts.append(ContentReasoning(reasoning=reasoning_item))
+                role = next((r for k, r in _ROLE_BY_CONTENT_KEY.items() if k in data), None)
+                if role is None:
+                    logger.error(
+                        f"No valid role found in {context} for span {raw_span_id}. Available keys: {list(data.keys())}"
+                    )
+                    return None
 
             # Find the content key to use
-            content_key = None
-            possible_content_keys = [
-                "content",
-                "user",
-                "assistant",
-                "system",
-                "developer",
-            ]
-            for possible_content_key in possible_content_keys:
-                if possible_content_key in data:
-                    content_key = possible_content_key
-                    break
+            content_key = next((k for k in _MESSAGE_CONTENT_KEYS if k in data), None)
+            raw_content = data[content_key] if content_key is not None else None
 
-            # Extract tool calls embedded in content, return the cleaned content
             tool_calls: List[ToolCall] = []
-            if content_key in data:
-                try:
-                    extracted_content, content_tool_calls = self._extract_tool_calls_from_content(
-                        data[content_key]
-                    )
-                    if content_tool_calls:
-                        tool_calls.extend(content_tool_calls)
-                    content_parts.append(ContentText(text=extracted_content))
+            content: str | List[Content]
+            if (
+                "reasoning" not in data
+                and isinstance(raw_content, str)
+                and not (raw_content.startswith("[") and raw_content.endswith("]"))
+            ):
+                # Plain text with no reasoning: nothing to extract, so skip building content parts
+                content = raw_content
+            else:
+                # Build content from available fields
+                content_parts: List[Content] = []
+
+                # Add reasoning if present
+                if "reasoning" in data:
+                    reasoning = data["reasoning"]
+                    if isinstance(reasoning, str):
+                        reasoning = [reasoning]
+                    for reasoning_item in reasoning:
+                        content_parts.append(ContentReasoning(reasoning=reasoning_item))
+
+                # Extract tool calls embedded in content, return the cleaned content
+                if content_key is not None:
+                    try:
+                        extracted_content, content_tool_calls = (
+                            self._extract_tool_calls_from_content(raw_content)
+                        )
+                        if content_tool_calls:
+                            tool_calls.extend(content_tool_calls)
+                        content_parts.append(ContentText(text=extracted_content))
 
-                except Exception as e:
-                    logger.warning(
-                        f"Failed to extract tool calls from content in {context} for span: {e} {self._get_span_debug_info(span)}"
-                    )
-                    # Continue without tool calls from content
+                    except Exception as e:
+                        logger.warning(
+                            "Failed to extract tool calls from content in %s for span: %s %s",
+                            context,
+                            e,
+                            _SpanDebugInfo(span),
+                        )
+                        # Continue without tool calls from content
 
-            content = content_parts
-            if len(content_parts) == 1 and content_parts[0].type == "text":
-                content = content_parts[0].text
+                content = content_parts
+                if len(content_parts) == 1 and content_parts[0].type == "text":
+                    content = content_parts[0].text
 
             # Handle structured tool calls
             if "tool_calls" in data:
@@ -2004,7 +2441,7 @@ class TelemetryService:
                 message_data["tool_calls"] = tool_calls
 
             message = parse_chat_message(message_data)
-            logger.debug(f"Successfully created {context} message: role={message.role}")
+            logger.debug("Successfully created %s message: role=%s", context, message.role)
             return message
 
         except KeyError as e:
@@ -2033,76 +2470,89 @@ class TelemetryService:
         """
         tool_calls = None
 
-        # Check if content contains tool calls (JSON array with tool_use objects)
-        if content.startswith("[") and content.endswith("]"):
-            try:
-                content_array = json.loads(content)
-                if isinstance(content_array, list):
-                    content_array_any = cast(List[Any], content_array)
-                    # Only keep dict items
-                    dict_items: list[dict[str, Any]] = [
-                        i for i in content_array_any if isinstance(i, dict)
-                    ]
-
-                    # Extract tool calls and filter content
-                    extracted_tool_calls: list[ToolCall] = []
-                    filtered_content_parts: list[str] = []
-
-                    for item in dict_items:
-                        content_type = item.get("type")
-
-                        if content_type == "tool_use":
-                            tool_item: dict[str, Any] = item
-                            tool_call = ToolCall(
-                                id=str(tool_item.get("id", "")),
-                                type="function",
-                                function=str(tool_item.get("name", "")),
-                                arguments=(
-                                    tool_item.get("input", {})
-                                    if isinstance(tool_item.get("input"), dict)
-                                    else {}
-                                ),
-                            )
-                            extracted_tool_calls.append(tool_call)
-                            logger.info(
-                                f"Extracted tool call: id={tool_call.id}, function={tool_call.function}"
-                            )
-                        elif content_type in ["text", "input_text"]:
-                            text_content = str(item.get("text", ""))
-                            if text_content and text_content != "":
-                                filtered_content_parts.append(text_content)
-                        elif content_type == "tool_result":
-                            content_str = json.dumps(item.get("content", ""))
-                            logger.info(f"Processing tool_result content: {content_str[:200]}...")
-                            text_content, _ = self._extract_tool_calls_from_content(content_str)
-                            filtered_content_parts.append(text_content)
-                        else:
-                            if content_type:
-                                logger.error(f"Unknown content JSON type: {content_type}")
-                            else:
-                                logger.debug("No content type found for item")
-
-                    # Update content and tool_calls
-                    if filtered_content_parts:
-                        filtered_content = "\n".join(filtered_content_parts)
-                        if filtered_content and filtered_content != "":
-                            content = filtered_content
-
-                    if extracted_tool_calls:
-                        tool_calls = extracted_tool_calls
-                        logger.info(f"Extracted {len(tool_calls)} tool calls from content")
-
-                    if not filtered_content_parts and not extracted_tool_calls:
-                        logger.debug(
-                            "No content or tool calls found for item, treating as regular content"
-                        )
-            except json.JSONDecodeError as e:
-                logger.debug(
-                    f"Content is not valid JSON: {e}, treating as regular content. Start of content: {str(content)[:200]}"
+        # Check if content contains tool calls (JSON array with tool_use objects). Only object
+        # items are used, so an array without any "{" (e.g. "[see above]") can't yield anything
+        # and is rejected without attempting a parse.
+        if content.startswith("[") and content.endswith("]") and "{" in content:
+            dict_items = _parse_content_array(content)
+            if dict_items is not None:
+                filtered_content, tool_calls = self._extract_tool_calls_from_content_items(
+                    dict_items
                 )
+                if filtered_content:
+                    content = filtered_content
 
         return content, tool_calls
 
+    def _extract_tool_calls_from_content_items(
+        self, items: Iterable[dict[str, Any]]
+    ) -> tuple[str | None, list[ToolCall] | None]:
+        """Extract tool calls and text from the parsed object items of a content array.
+
+        Args:
+            items: The object items of the content array
+
+        Returns:
+            Tuple of (filtered_content, tool_calls) where filtered_content is None if no text was
+            found and tool_calls is None if no tool calls were found
+        """
+        extracted_tool_calls: list[ToolCall] = []
+        filtered_content_parts: list[str] = []
+
+        for item in items:
+            content_type = item.get("type")
+
+            if content_type == "tool_use":
+                tool_item: dict[str, Any] = item
+                tool_input = tool_item.get("input")
+                tool_call = ToolCall(
+                    id=_intern_short(str(tool_item.get("id", ""))),
+                    type="function",
+                    function=_intern_short(str(tool_item.get("name", ""))),
+                    # Copy so messages don't share the cached parse result
+                    arguments=(
+                        copy.deepcopy(cast(dict[str, Any], tool_input))
+                        if isinstance(tool_input, dict)
+                        else {}
+                    ),
+                )
+                extracted_tool_calls.append(tool_call)
+                logger.info(
+                    "Extracted tool call: id=%s, function=%s",
+                    tool_call.id,
+                    tool_call.function,
+                )
+            elif content_type in ["text", "input_text"]:
+                text_content = str(item.get("text", ""))
+                if text_content and text_content != "":
+                    filtered_content_parts.append(text_content)
+            elif content_type == "tool_result":
+                tool_result_content = item.get("content", "")
+                logger.info("Processing tool_result content: %.200s...", tool_result_content)
+                # A list is processed like a content array without serializing it and parsing it
+                # back; anything else, or a list without text, is kept in its JSON form as before
+                text_content = None
+                if isinstance(tool_result_content, list):
+                    text_content, _ = self._extract_tool_calls_from_content_items(
+                        cast(dict[str, Any], i)
+                        for i in cast(List[Any], tool_result_content)
+                        if isinstance(i, dict)
+                    )
+                filtered_content_parts.append(text_content or json.dumps(tool_result_content))
+            else:
+                if content_type:
+                    logger.error(f"Unknown content JSON type: {content_type}")
+                else:
+                    logger.debug("No content type found for item")
+
+        if not filtered_content_parts and not extracted_tool_calls:
+            logger.debug("No content or tool calls found for item, treating as regular content")
+
+        if extracted_tool_calls:
+            logger.info("Extracted %d tool calls from content", len(extracted_tool_calls))
+
+        return "\n".join(filtered_content_parts) or None, extracted_tool_calls or None
+
     def _extract_tool_calls_from_span_data(self, tool_calls_data: dict[str, Any]) -> list[ToolCall]:
         """Extract tool calls from completion message tool_calls data.
 
@@ -2113,36 +2563,42 @@ class TelemetryService:
             List of ToolCall objects
         """
         tool_calls: list[ToolCall] = []
-        logger.debug(f"Extracting tool calls from completion data: {tool_calls_data}")
+        logger.debug("Extracting tool calls from completion data: %s", tool_calls_data)
 
-        for tool_index in sorted(tool_calls_data.keys()):
-            tool_data = tool_calls_data[tool_index]
-            logger.debug(f"Processing tool index {tool_index}: {tool_data}")
+        # Keys are unique, so sorting the items only ever compares keys
+        for tool_index, tool_data in sorted(tool_calls_data.items()):
+            logger.debug("Processing tool index %s: %s", tool_index, tool_data)
+            get_tool_field = tool_data.get
 
             # Parse arguments if present
             arguments: dict[str, Any] = {}
             if "arguments" in tool_data:
-                try:
-                    arguments = json.loads(tool_data["arguments"])
-                    logger.debug(
-                        f"Successfully parsed arguments for tool {tool_index}: {arguments}"
-                    )
-                except json.JSONDecodeError as e:
-                    logger.warning(
-                        f"Failed to parse tool call arguments for tool {tool_index}: {tool_data['arguments']}, error: {e}"
-                    )
-                    arguments = {"raw_arguments": tool_data["arguments"]}
+                raw_arguments = tool_data["arguments"]
+                if isinstance(raw_arguments, dict):
+                    # Some exporters send arguments already parsed
+                    arguments = cast(dict[str, Any], raw_arguments)
+                else:
+                    try:
+                        arguments = from_json(raw_arguments)
+                        logger.debug(
+                            "Successfully parsed arguments for tool %s: %s", tool_index, arguments
+                        )
+                    except ValueError as e:
+                        logger.warning(
+                            f"Failed to parse tool call arguments for tool {tool_index}: {raw_arguments}, error: {e}"
+                        )
+                        arguments = {"raw_arguments": raw_arguments}
 
             tool_call = ToolCall(
-                id=tool_data.get("id", ""),
+                id=_intern_short(get_tool_field("id", "")),
                 type="function",
-                function=tool_data.get("name", ""),
+                function=_intern_short(get_tool_field("name", "")),
                 arguments=arguments,
             )
             tool_calls.append(tool_call)
-            logger.debug(f"Created tool call: id={tool_call.id}, function={tool_call.function}")
+            logger.debug("Created tool call: id=%s, function=%s", tool_call.id, tool_call.function)
 
-        logger.debug(f"Extracted {len(tool_calls)} tool calls from completion data")
+        logger.debug("Extracted %d tool calls from completion data", len(tool_calls))
         return tool_calls
 
     def _extract_metadata_from_span_events(self, span: Dict[str, Any]) -> Dict[str, Any]:
@@ -2161,12 +2617,12 @@ class TelemetryService:
             if event.get("name") == "agent_run_metadata":
                 event_attrs = event.get("attributes", {})
 
-                # Extract metadata attributes that start with "metadata."
+                # Extract metadata attributes that start with "metadata."; comparing a slice
+                # is cheaper than a startswith method call for every attribute
                 for key, value in event_attrs.items():
-                    if key.startswith("metadata."):
+                    if key[:_METADATA_ATTRIBUTE_PREFIX_LENGTH] == _METADATA_ATTRIBUTE_PREFIX:
                         # Remove the "metadata." prefix to get the actual key
-                        metadata_key = key[len("metadata.") :]
-                        metadata[metadata_key] = value
+                        metadata[key[_METADATA_ATTRIBUTE_PREFIX_LENGTH:]] = value
 
         return metadata
 
@@ -2188,9 +2644,7 @@ class TelemetryService:
 
             # Navigate/create the nested structure
             for part in parts[:-1]:
-                if part not in current:
-                    current[part] = {}
-                current = current[part]
+                current = current.setdefault(part, {})
 
             # Set the value at the final location
             current[parts[-1]] = value
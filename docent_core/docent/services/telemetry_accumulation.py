@@ -5,24 +5,48 @@ This service replaces Redis storage for spans, scores, metadata, and other telem
 that needs to be accumulated before processing.
 """
 
+import functools
 import json
-from typing import Any, Dict, List, Optional
+import logging
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from typing import Any, Dict, List, Optional, Sequence
 from uuid import uuid4
 
-from sqlalchemy import and_, select
-from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy import ColumnElement, String, and_, func, literal, or_, select
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB, aggregate_order_by, insert
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import InstrumentedAttribute
 
 from docent._log_util import get_logger
 from docent_core.docent.db.schemas.tables import (
     SQLATelemetryAccumulation,
     SQLATelemetryAgentRunStatus,
     TelemetryAgentRunStatus,
-    sanitize_pg_text,
+    sanitize_pg_json,
 )
 
 logger = get_logger(__name__)
 
+ACCUMULATION_INSERT_BATCH_SIZE = 1000
+ACCUMULATION_FETCH_BATCH_SIZE = 500
+# Batches with more entries than this are written with COPY instead of INSERT
+ACCUMULATION_COPY_THRESHOLD = 200
+
+
+@dataclass
+class AccumulationEntry:
+    """An entry to add to telemetry accumulation."""
+
+    collection_id: str
+    data_type: str
+    data: Dict[str, Any]
+    agent_run_id: Optional[str] = None
+    transcript_group_id: Optional[str] = None
+    transcript_id: Optional[str] = None
+    timestamp: Optional[str] = None
+    user_id: Optional[str] = None
+
 
 class TelemetryAccumulationService:
     """Service for managing telemetry accumulation data."""
@@ -30,8 +54,9 @@ class TelemetryAccumulationService:
     def __init__(self, session: AsyncSession):
         self.session = session
 
+    @staticmethod
+    @functools.lru_cache(maxsize=4096)
     def _build_key(
-        self,
         collection_id: str,
         agent_run_id: Optional[str] = None,
         transcript_group_id: Optional[str] = None,
@@ -42,6 +67,9 @@ class TelemetryAccumulationService:
 
         Order: collection_id > agent_run_id > transcript_group_id > transcript_id
 
+        Keys are cached, since the same collection and agent run recur across every span,
+        score and metadata entry of a run.
+
         Args:
             collection_id: The collection ID
             agent_run_id: Optional agent run ID
@@ -51,6 +79,12 @@ class TelemetryAccumulationService:
         Returns:
             A human-readable key string
         """
+        # Fast paths for the common keys, which skip building and joining a list
+        if not transcript_group_id and not transcript_id:
+            if agent_run_id:
+                return f"collection_id={collection_id}:agent_run_id={agent_run_id}"
+            return f"collection_id={collection_id}"
+
         key_parts = [f"collection_id={collection_id}"]
 
         if agent_run_id:
@@ -64,105 +98,218 @@ class TelemetryAccumulationService:
 
         return ":".join(key_parts)
 
+    def _key_filter(
+        self,
+        collection_id: str,
+        agent_run_id: Optional[str] = None,
+        transcript_group_id: Optional[str] = None,
+        transcript_id: Optional[str] = None,
+    ) -> ColumnElement[bool]:
+        """
+        Build a filter matching the entries whose key starts with the given parts.
+
+        This mirrors a prefix match on the key built by `_build_key`: a part that is omitted
+        before a later part that is given must be absent, while trailing parts are unconstrained.
+
+        Entries written before the key columns existed have them unset, so those are still
+        matched by their key. The fallback can be dropped once no such rows remain.
+        """
+        parts = [
+            (SQLATelemetryAccumulation.agent_run_id, agent_run_id),
+            (SQLATelemetryAccumulation.transcript_group_id, transcript_group_id),
+            (SQLATelemetryAccumulation.transcript_id, transcript_id),
+        ]
+        while parts and not parts[-1][1]:
+            parts.pop()
+
+        filters: List[ColumnElement[bool]] = [
+            SQLATelemetryAccumulation.collection_id == collection_id
+        ]
+        for column, value in parts:
+            filters.append(column == value if value else column.is_(None))
+
+        key = self._build_key(collection_id, agent_run_id, transcript_group_id, transcript_id)
+        return or_(
+            and_(*filters),
+            and_(
+                SQLATelemetryAccumulation.collection_id.is_(None),
+                SQLATelemetryAccumulation.key.like(f"{key}%"),
+            ),
+        )
+
+    @staticmethod
+    def _key_part(column: InstrumentedAttribute[Optional[str]]) -> ColumnElement[Optional[str]]:
+        """
+        Read a key column, falling back to parsing the key for entries written before the key
+        columns existed. The fallback can be dropped along with the one in `_key_filter`.
+        """
+        return func.coalesce(
+            column, func.substring(SQLATelemetryAccumulation.key, f"(?:^|:){column.key}=([^:]*)")
+        )
+
+    @staticmethod
+    def _timestamp() -> ColumnElement[Optional[str]]:
+        """
+        The entry's timestamp, read from its data for entries written before the timestamp
+        column existed. The fallback can be dropped once no such rows remain.
+        """
+        return func.coalesce(
+            SQLATelemetryAccumulation.timestamp, SQLATelemetryAccumulation.data["timestamp"].astext
+        )
+
+    async def add_accumulation_entries(self, entries: Sequence[AccumulationEntry]) -> None:
+        """
+        Add a batch of entries to accumulation in a single transaction.
+
+        The agent runs the entries belong to are marked for processing in the same transaction.
+        Entry data is stored as given, so callers are responsible for sanitizing it.
+
+        Args:
+            entries: The entries to add
+        """
+        if not entries:
+            return
+
+        rows: list[dict[str, Any]] = []
+        agent_run_ids_by_collection: Dict[str, set[str]] = {}
+        for entry in entries:
+            rows.append(
+                {
+                    "id": str(uuid4()),
+                    "key": self._build_key(
+                        entry.collection_id,
+                        agent_run_id=entry.agent_run_id,
+                        transcript_group_id=entry.transcript_group_id,
+                        transcript_id=entry.transcript_id,
+                    ),
+                    "collection_id": entry.collection_id,
+                    "agent_run_id": entry.agent_run_id,
+                    "transcript_group_id": entry.transcript_group_id,
+                    "transcript_id": entry.transcript_id,
+                    "data_type": entry.data_type,
+                    "timestamp": entry.timestamp,
+                    "data": entry.data,
+                    "user_id": entry.user_id,
+                }
+            )
+            if entry.agent_run_id:
+                agent_run_ids_by_collection.setdefault(entry.collection_id, set()).add(
+                    entry.agent_run_id
+                )
+
+        if len(rows) > ACCUMULATION_COPY_THRESHOLD:
+            await self._copy_accumulation_rows(rows)
+        else:
+            # Insert in batches to stay under PostgreSQL's bind parameter limit
+            for i in range(0, len(rows), ACCUMULATION_INSERT_BATCH_SIZE):
+                await self.session.execute(
+                    insert(SQLATelemetryAccumulation).values(
+                        rows[i : i + ACCUMULATION_INSERT_BATCH_SIZE]
+                    )
+                )
+
+        for collection_id, agent_run_ids in agent_run_ids_by_collection.items():
+            await self._mark_agent_runs_for_processing(collection_id, agent_run_ids)
+
+        await self.session.commit()
+
+    async def _copy_accumulation_rows(self, rows: List[Dict[str, Any]]) -> None:
+        """
+        Write accumulation rows with COPY, which is much faster than INSERT for large batches.
+
+        The COPY runs on the session's connection, so it is part of the current transaction.
+        It bypasses SQLAlchemy, so column defaults are filled in and data is serialized here.
+
+        Args:
+            rows: Row dicts as built by `add_accumulation_entries`
+        """
+        columns = [*rows[0].keys(), "created_at"]
+        records: list[tuple[Any, ...]] = []
+        for row in rows:
+            row_values = dict(row)
+            row_values["data"] = json.dumps(row["data"])
+            row_values["created_at"] = datetime.now(UTC).replace(tzinfo=None)
+            records.append(tuple(row_values[column] for column in columns))
+
+        connection = await self.session.connection()
+        raw_connection = await connection.get_raw_connection()
+        await raw_connection.driver_connection.copy_records_to_table(  # type: ignore
+            SQLATelemetryAccumulation.__tablename__, records=records, columns=columns
+        )
+
     async def add_spans(
         self, collection_id: str, spans: List[Dict[str, Any]], user_id: Optional[str] = None
     ) -> None:
         """Add spans to accumulation for a collection."""
-        agent_run_ids: set[str] = set()
+        entries: list[AccumulationEntry] = []
 
         for span in spans:
             # Extract agent_run_id from span attributes if present
             agent_run_id = span.get("attributes", {}).get("agent_run_id")
-            if agent_run_id:
-                agent_run_ids.add(agent_run_id)
-                key = self._build_key(collection_id, agent_run_id=agent_run_id)
-            else:
+            if not agent_run_id:
                 logger.warning(
-                    f"Span missing agent_run_id: {span['span_id']}, collection_id={collection_id}"
+                    "Span missing agent_run_id: %s, collection_id=%s",
+                    span["span_id"],
+                    collection_id,
                 )
-                key = self._build_key(collection_id)
-
-            # Sanitize the span data to remove null characters and other problematic Unicode sequences
-            # Convert to JSON string, sanitize, then parse back to dict
-            json_str = json.dumps(span)
-            sanitized_json_str = sanitize_pg_text(json_str)
-            sanitized_span = json.loads(sanitized_json_str)
-
-            accumulation_entry = SQLATelemetryAccumulation(
-                key=key,
-                data_type="spans",
-                data=sanitized_span,
-                user_id=user_id,
-            )
-            self.session.add(accumulation_entry)
 
-        await self.session.commit()
-        logger.info(
-            f"Added {len(spans)} spans to accumulation for collection {collection_id}, span_ids={', '.join([span['raw_span_id'] for span in spans])}"
-        )
+            entries.append(
+                AccumulationEntry(
+                    collection_id=collection_id,
+                    data_type="spans",
+                    # Remove null characters and other problematic Unicode sequences
+                    data=sanitize_pg_json(span),
+                    agent_run_id=agent_run_id or None,
+                    user_id=user_id,
+                )
+            )
 
-        # Mark agent runs for processing
-        if agent_run_ids:
-            await self._mark_agent_runs_for_processing(collection_id, agent_run_ids)
+        await self.add_accumulation_entries(entries)
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(
+                "Added %d spans to accumulation for collection %s, span_ids=%s",
+                len(spans),
+                collection_id,
+                ", ".join([span["raw_span_id"] for span in spans]),
+            )
 
     async def get_accumulated_spans(self, collection_id: str) -> List[Dict[str, Any]]:
         """Get all accumulated spans for a collection."""
-        # Use pattern matching to find all spans for this collection
-        key = self._build_key(collection_id)
         stmt = (
-            select(SQLATelemetryAccumulation)
+            select(SQLATelemetryAccumulation.data)
             .where(
                 and_(
-                    SQLATelemetryAccumulation.key.like(f"{key}%"),
+                    self._key_filter(collection_id),
                     SQLATelemetryAccumulation.data_type == "spans",
                 )
             )
             .order_by(SQLATelemetryAccumulation.created_at)
         )
 
-        result = await self.session.execute(stmt)
-        entries = result.scalars().all()
-
-        spans: List[Dict[str, Any]] = []
-        for entry in entries:
-            try:
-                spans.append(entry.data)
-            except Exception as e:
-                logger.error(f"Failed to process span data for collection {collection_id}: {e}")
-                continue
-
-        return spans
+        result = await self.session.stream_scalars(
+            stmt.execution_options(yield_per=ACCUMULATION_FETCH_BATCH_SIZE)
+        )
+        return [data async for data in result]
 
     async def get_agent_run_spans(
         self, collection_id: str, agent_run_id: str
     ) -> List[Dict[str, Any]]:
         """Get accumulated spans for a specific agent run in a collection."""
-        # Build key for the agent run
-        key = self._build_key(collection_id, agent_run_id=agent_run_id)
-
         stmt = (
-            select(SQLATelemetryAccumulation)
+            select(SQLATelemetryAccumulation.data)
             .where(
                 and_(
-                    SQLATelemetryAccumulation.key.like(f"{key}%"),
+                    self._key_filter(collection_id, agent_run_id=agent_run_id),
                     SQLATelemetryAccumulation.data_type == "spans",
                 )
             )
             .order_by(SQLATelemetryAccumulation.created_at)
         )
 
-        result = await self.session.execute(stmt)
-        entries = result.scalars().all()
-
-        spans: List[Dict[str, Any]] = []
-        for entry in entries:
-            try:
-                spans.append(entry.data)
-            except Exception as e:
-                logger.error(f"Failed to process span data for collection {collection_id}: {e}")
-                continue
-
-        return spans
+        result = await self.session.stream_scalars(
+            stmt.execution_options(yield_per=ACCUMULATION_FETCH_BATCH_SIZE)
+        )
+        return [data async for data in result]
 
     async def add_score(
         self,
@@ -174,7 +321,6 @@ class TelemetryAccumulationService:
         user_id: Optional[str] = None,
     ) -> None:
         """Add a score to accumulation for an agent run."""
-        key = self._build_key(collection_id, agent_run_id=agent_run_id)
         score_data = {
             "collection_id": collection_id,
             "agent_run_id": agent_run_id,
@@ -183,57 +329,49 @@ class TelemetryAccumulationService:
             "timestamp": timestamp,
         }
 
-        # Sanitize the score data to remove null characters and other problematic Unicode sequences
-        # Convert to JSON string, sanitize, then parse back to dict
-        json_str = json.dumps(score_data)
-        sanitized_json_str = sanitize_pg_text(json_str)
-        sanitized_score_data = json.loads(sanitized_json_str)
-
-        accumulation_entry = SQLATelemetryAccumulation(
-            key=key,
-            data_type="scores",
-            data=sanitized_score_data,
-            user_id=user_id,
+        # Remove null characters and other problematic Unicode sequences
+        sanitized_score_data = sanitize_pg_json(score_data)
+
+        await self.add_accumulation_entries(
+            [
+                AccumulationEntry(
+                    collection_id=collection_id,
+                    agent_run_id=agent_run_id,
+                    data_type="scores",
+                    timestamp=timestamp,
+                    data=sanitized_score_data,
+                    user_id=user_id,
+                )
+            ]
         )
-        self.session.add(accumulation_entry)
-        await self.session.commit()
 
         logger.info(
             f"Added score {score_name}={score_value} for agent_run_id {agent_run_id} in collection {collection_id}"
         )
 
-        # Mark agent run for processing
-        await self._mark_agent_runs_for_processing(collection_id, {agent_run_id})
-
     async def get_collection_scores(self, collection_id: str) -> Dict[str, List[Dict[str, Any]]]:
         """Get all scores for a collection, grouped by agent_run_id."""
-        # Use pattern matching to find all scores for this collection
-        key = self._build_key(collection_id)
+        # Group and order the entries in the database, so rows arrive in their final shape
         stmt = (
-            select(SQLATelemetryAccumulation)
+            select(
+                self._key_part(SQLATelemetryAccumulation.agent_run_id).label("agent_run_id"),
+                func.jsonb_agg(
+                    aggregate_order_by(SQLATelemetryAccumulation.data, self._timestamp().asc()),
+                    type_=JSONB,
+                ).label("entries"),
+            )
             .where(
                 and_(
-                    SQLATelemetryAccumulation.key.like(f"{key}%"),
+                    self._key_filter(collection_id),
                     SQLATelemetryAccumulation.data_type == "scores",
                 )
             )
-            .order_by(SQLATelemetryAccumulation.data.op("->>")("timestamp").asc())
+            .group_by(self._key_part(SQLATelemetryAccumulation.agent_run_id))
+            .order_by(func.min(self._timestamp()))
         )
 
         result = await self.session.execute(stmt)
-        entries = result.scalars().all()
-
-        scores: Dict[str, List[Dict[str, Any]]] = {}
-        for entry in entries:
-            try:
-                agent_run_id = entry.data.get("agent_run_id")
-                if agent_run_id not in scores:
-                    scores[agent_run_id] = []
-
-                scores[agent_run_id].append(entry.data)
-            except Exception as e:
-                logger.error(f"Failed to process score data for collection {collection_id}: {e}")
-                continue
+        scores: Dict[str, List[Dict[str, Any]]] = {row.agent_run_id: row.entries for row in result}
 
         return scores
 
@@ -241,32 +379,21 @@ class TelemetryAccumulationService:
         self, collection_id: str, agent_run_id: str
     ) -> List[Dict[str, Any]]:
         """Get scores for a specific agent run in a collection, returning a flat list of score data."""
-        # Build key for the agent run to find its scores
-        key = self._build_key(collection_id, agent_run_id=agent_run_id)
-
         stmt = (
-            select(SQLATelemetryAccumulation)
+            select(SQLATelemetryAccumulation.data)
             .where(
                 and_(
-                    SQLATelemetryAccumulation.key.like(f"{key}%"),
+                    self._key_filter(collection_id, agent_run_id=agent_run_id),
                     SQLATelemetryAccumulation.data_type == "scores",
                 )
             )
-            .order_by(SQLATelemetryAccumulation.data.op("->>")("timestamp").asc())
+            .order_by(self._timestamp().asc())
         )
 
-        result = await self.session.execute(stmt)
-        entries = result.scalars().all()
-
-        scores: List[Dict[str, Any]] = []
-        for entry in entries:
-            try:
-                scores.append(entry.data)
-            except Exception as e:
-                logger.error(f"Failed to process score data for collection {collection_id}: {e}")
-                continue
-
-        return scores
+        result = await self.session.stream_scalars(
+            stmt.execution_options(yield_per=ACCUMULATION_FETCH_BATCH_SIZE)
+        )
+        return [data async for data in result]
 
     async def add_agent_run_metadata(
         self,
@@ -277,7 +404,6 @@ class TelemetryAccumulationService:
         user_id: Optional[str] = None,
     ) -> None:
         """Add agent run metadata to accumulation."""
-        key = self._build_key(collection_id, agent_run_id=agent_run_id)
         metadata_data = {
             "collection_id": collection_id,
             "agent_run_id": agent_run_id,
@@ -285,61 +411,53 @@ class TelemetryAccumulationService:
             "timestamp": timestamp,
         }
 
-        # Sanitize the metadata data to remove null characters and other problematic Unicode sequences
-        # Convert to JSON string, sanitize, then parse back to dict
-        json_str = json.dumps(metadata_data)
-        sanitized_json_str = sanitize_pg_text(json_str)
-        sanitized_metadata_data = json.loads(sanitized_json_str)
-
-        accumulation_entry = SQLATelemetryAccumulation(
-            key=key,
-            data_type="metadata",
-            data=sanitized_metadata_data,
-            user_id=user_id,
+        # Remove null characters and other problematic Unicode sequences
+        sanitized_metadata_data = sanitize_pg_json(metadata_data)
+
+        await self.add_accumulation_entries(
+            [
+                AccumulationEntry(
+                    collection_id=collection_id,
+                    agent_run_id=agent_run_id,
+                    data_type="metadata",
+                    timestamp=timestamp,
+                    data=sanitized_metadata_data,
+                    user_id=user_id,
+                )
+            ]
         )
-        self.session.add(accumulation_entry)
-        await self.session.commit()
 
         logger.info(
             f"Added agent run metadata for agent_run_id {agent_run_id} in collection {collection_id}"
         )
 
-        # Mark agent run for processing
-        await self._mark_agent_runs_for_processing(collection_id, {agent_run_id})
-
     async def get_collection_agent_run_metadata(
         self, collection_id: str
     ) -> Dict[str, List[Dict[str, Any]]]:
         """Get all agent run metadata for a collection, grouped by agent_run_id."""
-        # Use pattern matching to find all agent run metadata for this collection
-        key = self._build_key(collection_id)
+        # Group and order the entries in the database, so rows arrive in their final shape
         stmt = (
-            select(SQLATelemetryAccumulation)
+            select(
+                self._key_part(SQLATelemetryAccumulation.agent_run_id).label("agent_run_id"),
+                func.jsonb_agg(
+                    aggregate_order_by(SQLATelemetryAccumulation.data, self._timestamp().asc()),
+                    type_=JSONB,
+                ).label("entries"),
+            )
             .where(
                 and_(
-                    SQLATelemetryAccumulation.key.like(f"{key}%"),
+                    self._key_filter(collection_id),
                     SQLATelemetryAccumulation.data_type == "metadata",
                 )
             )
-            .order_by(SQLATelemetryAccumulation.data.op("->>")("timestamp").asc())
+            .group_by(self._key_part(SQLATelemetryAccumulation.agent_run_id))
+            .order_by(func.min(self._timestamp()))
         )
 
         result = await self.session.execute(stmt)
-        entries = result.scalars().all()
-
-        metadata: Dict[str, List[Dict[str, Any]]] = {}
-        for entry in entries:
-            try:
-                agent_run_id = entry.data.get("agent_run_id")
-                if agent_run_id not in metadata:
-                    metadata[agent_run_id] = []
-
-                metadata[agent_run_id].append(entry.data)
-            except Exception as e:
-                logger.error(
-                    f"Failed to process agent run metadata for collection {collection_id}: {e}"
-                )
-                continue
+        metadata: Dict[str, List[Dict[str, Any]]] = {
+            row.agent_run_id: row.entries for row in result
+        }
 
         return metadata
 
@@ -347,34 +465,21 @@ class TelemetryAccumulationService:
         self, collection_id: str, agent_run_id: str
     ) -> List[Dict[str, Any]]:
         """Get agent run metadata for a specific agent run in a collection, returning a flat list of metadata."""
-        # Build key for the agent run to find its metadata
-        key = self._build_key(collection_id, agent_run_id=agent_run_id)
-
         stmt = (
-            select(SQLATelemetryAccumulation)
+            select(SQLATelemetryAccumulation.data)
             .where(
                 and_(
-                    SQLATelemetryAccumulation.key.like(f"{key}%"),
+                    self._key_filter(collection_id, agent_run_id=agent_run_id),
                     SQLATelemetryAccumulation.data_type == "metadata",
                 )
             )
-            .order_by(SQLATelemetryAccumulation.data.op("->>")("timestamp").asc())
+            .order_by(self._timestamp().asc())
         )
 
-        result = await self.session.execute(stmt)
-        entries = result.scalars().all()
-
-        metadata: List[Dict[str, Any]] = []
-        for entry in entries:
-            try:
-                metadata.append(entry.data)
-            except Exception as e:
-                logger.error(
-                    f"Failed to process agent run metadata for collection {collection_id}: {e}"
-                )
-                continue
-
-        return metadata
+        result = await self.session.stream_scalars(
+            stmt.execution_options(yield_per=ACCUMULATION_FETCH_BATCH_SIZE)
+        )
+        return [data async for data in result]
 
     async def add_transcript_metadata(
         self,
@@ -388,25 +493,27 @@ class TelemetryAccumulationService:
         user_id: Optional[str] = None,
     ) -> None:
         """Add transcript metadata to accumulation."""
-        key = self._build_key(
-            collection_id, transcript_group_id=transcript_group_id, transcript_id=transcript_id
-        )
-        accumulation_entry = SQLATelemetryAccumulation(
-            key=key,
-            data_type="transcript_metadata",
-            data={
-                "collection_id": collection_id,
-                "transcript_id": transcript_id,
-                "name": name,
-                "description": description,
-                "transcript_group_id": transcript_group_id,
-                "metadata": metadata,
-                "timestamp": timestamp,
-            },
-            user_id=user_id,
+        await self.add_accumulation_entries(
+            [
+                AccumulationEntry(
+                    collection_id=collection_id,
+                    transcript_group_id=transcript_group_id or None,
+                    transcript_id=transcript_id,
+                    data_type="transcript_metadata",
+                    timestamp=timestamp,
+                    data={
+                        "collection_id": collection_id,
+                        "transcript_id": transcript_id,
+                        "name": name,
+                        "description": description,
+                        "transcript_group_id": transcript_group_id,
+                        "metadata": metadata,
+                        "timestamp": timestamp,
+                    },
+                    user_id=user_id,
+                )
+            ]
         )
-        self.session.add(accumulation_entry)
-        await self.session.commit()
 
         logger.info(
             f"Added transcript metadata for transcript_id {transcript_id} in collection {collection_id}"
@@ -425,66 +532,55 @@ class TelemetryAccumulationService:
         user_id: Optional[str] = None,
     ) -> None:
         """Add transcript group metadata to accumulation."""
-        key = self._build_key(
-            collection_id, agent_run_id=agent_run_id, transcript_group_id=transcript_group_id
-        )
-        accumulation_entry = SQLATelemetryAccumulation(
-            key=key,
-            data_type="transcript_group_metadata",
-            data={
-                "transcript_group_id": transcript_group_id,
-                "collection_id": collection_id,
-                "agent_run_id": agent_run_id,
-                "name": name,
-                "description": description,
-                "parent_transcript_group_id": parent_transcript_group_id,
-                "metadata": metadata,
-                "timestamp": timestamp,
-            },
-            user_id=user_id,
+        await self.add_accumulation_entries(
+            [
+                AccumulationEntry(
+                    collection_id=collection_id,
+                    agent_run_id=agent_run_id,
+                    transcript_group_id=transcript_group_id,
+                    data_type="transcript_group_metadata",
+                    timestamp=timestamp,
+                    data={
+                        "transcript_group_id": transcript_group_id,
+                        "collection_id": collection_id,
+                        "agent_run_id": agent_run_id,
+                        "name": name,
+                        "description": description,
+                        "parent_transcript_group_id": parent_transcript_group_id,
+                        "metadata": metadata,
+                        "timestamp": timestamp,
+                    },
+                    user_id=user_id,
+                )
+            ]
         )
-        self.session.add(accumulation_entry)
-        await self.session.commit()
 
         logger.info(
             f"Added transcript group metadata for transcript_group_id {transcript_group_id} in collection {collection_id}"
         )
 
-        # Mark agent run for processing
-        await self._mark_agent_runs_for_processing(collection_id, {agent_run_id})
-
     async def get_transcript_group_metadata(self, collection_id: str) -> Dict[str, Dict[str, Any]]:
         """Get all transcript group metadata for a collection, merging multiple calls with recent data taking precedence."""
-        # Use pattern matching to find all transcript group metadata for this collection
-        key = self._build_key(collection_id)
+        # Every entry carries all fields, so merging entries with newer ones taking precedence is
+        # the same as keeping the newest entry per transcript group, which DISTINCT ON selects
         stmt = (
-            select(SQLATelemetryAccumulation)
+            select(SQLATelemetryAccumulation.data)
+            .distinct(self._key_part(SQLATelemetryAccumulation.transcript_group_id))
             .where(
                 and_(
-                    SQLATelemetryAccumulation.key.like(f"{key}%"),
+                    self._key_filter(collection_id),
                     SQLATelemetryAccumulation.data_type == "transcript_group_metadata",
                 )
             )
-            .order_by(SQLATelemetryAccumulation.data.op("->>")("timestamp").asc())
+            .order_by(
+                self._key_part(SQLATelemetryAccumulation.transcript_group_id),
+                self._timestamp().desc(),
+                SQLATelemetryAccumulation.created_at.desc(),
+            )
         )
 
-        result = await self.session.execute(stmt)
-        entries = result.scalars().all()
-
-        metadata: Dict[str, Dict[str, Any]] = {}
-        for entry in entries:
-            try:
-                transcript_group_id = entry.data.get("transcript_group_id")
-                if transcript_group_id not in metadata:
-                    metadata[transcript_group_id] = {}
-
-                # Merge metadata, with newer entries taking precedence
-                metadata[transcript_group_id].update(entry.data)
-            except Exception as e:
-                logger.error(
-                    f"Failed to process transcript group metadata for collection {collection_id}: {e}"
-                )
-                continue
+        result = await self.session.scalars(stmt)
+        metadata: Dict[str, Dict[str, Any]] = {data["transcript_group_id"]: data for data in result}
 
         return metadata
 
@@ -492,38 +588,26 @@ class TelemetryAccumulationService:
         self, collection_id: str, agent_run_id: str
     ) -> Dict[str, Dict[str, Any]]:
         """Get transcript group metadata for a specific agent run in a collection, merging multiple calls with recent data taking precedence."""
-        # Build key for the agent run to find its transcript group metadata
-        key = self._build_key(collection_id, agent_run_id=agent_run_id)
-
+        # Every entry carries all fields, so merging entries with newer ones taking precedence is
+        # the same as keeping the newest entry per transcript group, which DISTINCT ON selects
         stmt = (
-            select(SQLATelemetryAccumulation)
+            select(SQLATelemetryAccumulation.data)
+            .distinct(self._key_part(SQLATelemetryAccumulation.transcript_group_id))
             .where(
                 and_(
-                    SQLATelemetryAccumulation.key.like(f"{key}%"),
+                    self._key_filter(collection_id, agent_run_id=agent_run_id),
                     SQLATelemetryAccumulation.data_type == "transcript_group_metadata",
                 )
             )
-            .order_by(SQLATelemetryAccumulation.data.op("->>")("timestamp").asc())
+            .order_by(
+                self._key_part(SQLATelemetryAccumulation.transcript_group_id),
+                self._timestamp().desc(),
+                SQLATelemetryAccumulation.created_at.desc(),
+            )
         )
 
-        result = await self.session.execute(stmt)
-        entries = result.scalars().all()
-
-        metadata: Dict[str, Dict[str, Any]] = {}
-        for entry in entries:
-            try:
-                transcript_group_id = entry.data.get("transcript_group_id")
-
-                if transcript_group_id not in metadata:
-                    metadata[transcript_group_id] = {}
-
-                # Merge metadata, with newer entries taking precedence
-                metadata[transcript_group_id].update(entry.data)
-            except Exception as e:
-                logger.error(
-                    f"Failed to process transcript group metadata for collection {collection_id}: {e}"
-                )
-                continue
+        result = await self.session.scalars(stmt)
+        metadata: Dict[str, Dict[str, Any]] = {data["transcript_group_id"]: data for data in result}
 
         return metadata
 
@@ -558,7 +642,12 @@ class TelemetryAccumulationService:
 
         result = await self.session.execute(
             delete(SQLATelemetryAccumulation).where(
-                SQLATelemetryAccumulation.key.like(f"{key_pattern}%")
+                self._key_filter(
+                    collection_id,
+                    agent_run_id=agent_run_id,
+                    transcript_group_id=transcript_group_id,
+                    transcript_id=transcript_id,
+                )
             )
         )
 
@@ -587,23 +676,21 @@ class TelemetryAccumulationService:
 
         # Use a single atomic operation to mark all agent runs as pending
         # This prevents race conditions where some agent runs get marked but others don't
-        # Create status records for all agent runs atomically
-        status_records: list[dict[str, Any]] = []
-        for agent_run_id in agent_run_ids:
-            status_records.append(
-                {
-                    "id": str(uuid4()),
-                    "collection_id": collection_id,
-                    "agent_run_id": agent_run_id,
-                    "status": TelemetryAgentRunStatus.NEEDS_PROCESSING.value,
-                    "metadata_json": None,
-                }
-            )
+        # The agent run IDs are passed as one array and unnested, so the statement text (and
+        # its plan) is the same however many agent runs are marked; PostgreSQL generates the IDs
+        status_records = select(
+            func.gen_random_uuid().cast(String),
+            literal(collection_id, String),
+            func.unnest(literal(list(agent_run_ids), ARRAY(String))),
+            literal(TelemetryAgentRunStatus.NEEDS_PROCESSING.value, String),
+        )
 
         # Use PostgreSQL's ON CONFLICT to handle upserts atomically
         # Always mark as needs_processing regardless of current status
         # Increment current_version to indicate new data has arrived
-        stmt = insert(SQLATelemetryAgentRunStatus).values(status_records)
+        stmt = insert(SQLATelemetryAgentRunStatus).from_select(
+            ["id", "collection_id", "agent_run_id", "status"], status_records
+        )
         stmt = stmt.on_conflict_do_update(
             index_elements=["agent_run_id"],
             set_={
@@ -614,7 +701,6 @@ class TelemetryAccumulationService:
         )
 
         await self.session.execute(stmt)
-        await self.session.commit()
 
         logger.debug(
             f"Marked {len(agent_run_ids)} agent runs for processing in collection {collection_id}"
@@ -1,41 +1,45 @@
-import asyncio
+import time
 
 import anyio
+from arq.worker import Retry
 
 from docent._log_util import get_logger
 from docent_core._server._broker.redis_client import publish_collection_update
+from docent_core._worker.constants import JOB_RETRY_DELAY_SECONDS
 from docent_core.docent.db.contexts import ViewContext
 from docent_core.docent.db.schemas.tables import JobStatus, SQLAJob
 from docent_core.docent.services.monoservice import MonoService
 
 logger = get_logger(__name__)
 
+# Minimum time between embedding progress updates sent to clients
+EMBEDDING_PROGRESS_MIN_INTERVAL_SECONDS = 0.1
+
 
 async def compute_embeddings(ctx: ViewContext, job: SQLAJob):
     logger.info(f"Starting compute_embeddings: ctx={ctx}, job_id={job.id}")
 
     mono_svc = await MonoService.init()
 
-    # Wait for any running embedding jobs
-    while (
-        res := await mono_svc.get_oldest_active_embedding_job(ctx.collection_id)
-    ) is not None and res.id != job.id:
-        logger.info(
-            f"Job {job.id} waiting for existing embedding job to complete for collection_id {ctx.collection_id}"
-        )
-        await asyncio.sleep(5)
-
     should_index = job.job_json["should_index"]
 
-    await mono_svc.set_job_status(job.id, JobStatus.RUNNING)
-
-    # Track completion states
     errored = False
-    embedding_completed = False
-    indexing_completed = False
+    last_sent_progress: int | None = None
+    last_sent_at = 0.0
 
     async def _progress_callback(progress: int):
         """Callback for embedding computation progress"""
+        nonlocal last_sent_progress, last_sent_at
+
+        # Progress is reported once per embedding batch; only send changed values, throttled,
+        # except for completion which is always sent
+        now = time.monotonic()
+        if progress == last_sent_progress or (
+            progress < 100 and now - last_sent_at < EMBEDDING_PROGRESS_MIN_INTERVAL_SECONDS
+        ):
+            return
+        last_sent_progress, last_sent_at = progress, now
+
         progress_data = {
             "indexing_phase": "pending" if should_index else "not_required",
             "embedding_progress": progress,
@@ -48,45 +52,35 @@ async def compute_embeddings(ctx: ViewContext, job: SQLAJob):
             {"action": "embedding_progress", "payload": progress_data},
         )
 
-    async def _poll_indexing_status():
-        nonlocal embedding_completed, indexing_completed
-
-        """Poll and report indexing progress after embeddings complete"""
-        # Wait for embeddings to complete before starting to poll
-        while not embedding_completed:
-            await asyncio.sleep(1)
-
-        # Now start polling for indexing progress
-        while not indexing_completed:
-            await asyncio.sleep(1)
-
-            phase, percent = await mono_svc.get_indexing_progress(ctx.collection_id)
-            if phase is None:
-                continue
-
-            progress_data = {
-                "indexing_phase": phase,
-                "embedding_progress": 100,
-                "indexing_progress": percent or 0,
-            }
-
-            # Send via websocket instead of Redis stream
-            await publish_collection_update(
-                ctx.collection_id,
-                {"action": "embedding_progress", "payload": progress_data},
-            )
+    async def _indexing_progress_callback(phase: str, percent: int):
+        """Callback for index build progress"""
+        progress_data = {
+            "indexing_phase": phase,
+            "embedding_progress": 100,
+            "indexing_progress": percent,
+        }
 
-            # If indexing is complete (100%), we can stop polling
-            if percent is not None and percent >= 100:
-                indexing_completed = True
-                break
+        # Send via websocket instead of Redis stream
+        await publish_collection_update(
+            ctx.collection_id,
+            {"action": "embedding_progress", "payload": progress_data},
+        )
 
     async def _run():
         """Main embedding computation logic"""
-        nonlocal embedding_completed, indexing_completed, errored
+        nonlocal errored
+
+        async with mono_svc.try_advisory_lock(
+            ctx.collection_id, action_id="compute_embeddings"
+        ) as acquired:
+            if not acquired:
+                # Another embedding job is running for this collection; free the worker meanwhile
+                logger.info(
+                    f"Job {job.id} deferred while another embedding job runs for {ctx.collection_id}"
+                )
+                raise Retry(defer=JOB_RETRY_DELAY_SECONDS)
 
-        try:
-            async with mono_svc.advisory_lock(ctx.collection_id, action_id="compute_embeddings"):
+            try:
                 # Compute embeddings
                 embedding_status = await mono_svc.compute_embeddings(ctx, _progress_callback)
 
@@ -94,11 +88,9 @@ async def compute_embeddings(ctx: ViewContext, job: SQLAJob):
                     errored = True
                     return
 
-                embedding_completed = True
                 logger.info(f"Embeddings computation completed for job {job.id}")
 
                 if not should_index:
-                    indexing_completed = True
                     return
 
                 # Report that we're starting indexing
@@ -114,30 +106,26 @@ async def compute_embeddings(ctx: ViewContext, job: SQLAJob):
                 )
 
                 # Compute index
-                await mono_svc.compute_ivfflat_index(ctx)
-                indexing_completed = True
+                await mono_svc.compute_ivfflat_index(ctx, _indexing_progress_callback)
                 logger.info(f"Indexing completed for job {job.id}")
 
-        except Exception as e:
-            logger.error(f"Error computing embeddings for job {job.id}: {e}")
-            errored = True
-            raise
-
-        finally:
-            with anyio.CancelScope(shield=True):
-                if errored:
-                    logger.highlight(f"Job {job.id} canceled", color="red")
-                    await mono_svc.set_job_status(job.id, JobStatus.CANCELED)
-                else:
-                    logger.highlight(f"Job {job.id} finished", color="green")
-                    await mono_svc.set_job_status(job.id, JobStatus.COMPLETED)
-                    # Send completion message via websocket
-                    await publish_collection_update(
-                        ctx.collection_id,
-                        {"action": "embedding_complete", "payload": {}},
-                    )
-
-    async with anyio.create_task_group() as tg:
-        tg.start_soon(_run)
-        if should_index:
-            tg.start_soon(_poll_indexing_status)
+            except Exception as e:
+                logger.error(f"Error computing embeddings for job {job.id}: {e}")
+                errored = True
+                raise
+
+            finally:
+                with anyio.CancelScope(shield=True):
+                    if errored:
+                        logger.highlight(f"Job {job.id} canceled", color="red")
+                        await mono_svc.set_job_status(job.id, JobStatus.CANCELED)
+                    else:
+                        logger.highlight(f"Job {job.id} finished", color="green")
+                        await mono_svc.set_job_status(job.id, JobStatus.COMPLETED)
+                        # Send completion message via websocket
+                        await publish_collection_update(
+                            ctx.collection_id,
+                            {"action": "embedding_complete", "payload": {}},
+                        )
+
+    await _run()
@@ -5,6 +5,7 @@ from typing import AsyncGenerator
 import pytest_asyncio
 import redis.asyncio as redis
 from arq import ArqRedis
+from sqlalchemy import text
 from sqlalchemy.engine.url import URL
 from sqlalchemy.ext.asyncio import (
     AsyncEngine,
@@ -33,19 +34,33 @@ TEST_DATABASE_URL = URL.create(
 
 TEST_REDIS_URL = "redis://localhost:6379/1"  # Use database 1 for tests
 
+# Whether the schema has been created in this test session
+_schema_created = False
+
 
 # Function scope for this fixture may slow down tests, but avoids tricky asyncio problems
 @pytest_asyncio.fixture(scope="function")
 async def db_engine() -> AsyncGenerator[AsyncEngine, None]:
+    global _schema_created
+
     engine = create_async_engine(
         TEST_DATABASE_URL, pool_size=10, max_overflow=20, pool_pre_ping=True, echo=False
     )
     try:
         async with engine.begin() as conn:
-            # Clean slate: drop all tables first, then create them
-            # This ensures tests start clean even if previous run was interrupted
-            await conn.run_sync(SQLABase.metadata.drop_all)
-            await conn.run_sync(SQLABase.metadata.create_all)
+            if not _schema_created:
+                # Clean slate: drop all tables first, then create them
+                # This ensures tests start clean even if previous run was interrupted
+                await conn.run_sync(SQLABase.metadata.drop_all)
+                await conn.run_sync(SQLABase.metadata.create_all)
+                _schema_created = True
+            else:
+                # The schema is already in place; emptying the tables is much cheaper than DDL
+                preparer = engine.dialect.identifier_preparer
+                table_names = ", ".join(
+                    preparer.format_table(table) for table in SQLABase.metadata.sorted_tables
+                )
+                await conn.execute(text(f"TRUNCATE TABLE {table_names} RESTART IDENTITY CASCADE"))
         yield engine
     finally:
         try:
@@ -122,9 +137,7 @@ async def redis_client() -> AsyncGenerator[ArqRedis, None]:
     """
     Test-scoped fixture that provides Redis client with test database.
     """
-    client = ArqRedis(
-        connection_pool=redis.ConnectionPool.from_url(TEST_REDIS_URL, decode_responses=True)  # type: ignore
-    )
+    client = ArqRedis(connection_pool=redis.ConnectionPool.from_url(TEST_REDIS_URL))  # type: ignore
     try:
         # Clear test database before test
         await client.flushdb()  # type: ignore
@@ -6,8 +6,10 @@ import httpx
 import pytest_asyncio
 from httpx import ASGITransport
 
+from docent_core._server._auth.session import COOKIE_KEY
 from docent_core._server.api import asgi_app
 from docent_core.docent.db.schemas.auth_models import User
+from docent_core.docent.services.monoservice import MonoService
 
 
 @pytest_asyncio.fixture(scope="function")
@@ -19,13 +21,14 @@ async def client() -> AsyncGenerator[httpx.AsyncClient, None]:
 
 
 @pytest_asyncio.fixture(scope="function")
-async def authed_client(test_user: User) -> AsyncGenerator[httpx.AsyncClient, None]:
+async def authed_client(
+    test_user: User, mono_service: MonoService
+) -> AsyncGenerator[httpx.AsyncClient, None]:
+    # Create the session directly instead of logging in, which would verify the password hash
+    session_id = await mono_service.create_session(test_user.id)
     async with httpx.AsyncClient(
-        transport=ASGITransport(app=asgi_app), base_url="http://test"
+        transport=ASGITransport(app=asgi_app),
+        base_url="http://test",
+        cookies={COOKIE_KEY: session_id},
     ) as client:
-        resp = await client.post(
-            "/rest/login",
-            json={"email": "pytest_integration@example.com", "password": "test_password_123"},
-        )
-        assert resp.status_code == 200
         yield client
@@ -1,14 +1,16 @@
+from pathlib import Path
+
 import httpx
 import pytest
 
+CTF_JSON = (Path(__file__).parent / "data" / "ctf.json").read_bytes()
+
 
 @pytest.mark.integration
 async def test_upload_file(test_collection_id: str, authed_client: httpx.AsyncClient):
-    with open("tests/integration/data/ctf.json", "rb") as f:
-        file_content = f.read()
     response = await authed_client.post(
         f"/rest/{test_collection_id}/preview_import_runs_from_file",
-        files={"file": ("abc.json", file_content, "application/json")},
+        files={"file": ("abc.json", CTF_JSON, "application/json")},
     )
     assert response.status_code == 200
     data = response.json()
@@ -1,72 +1,86 @@
 """Unit tests for citation parsing functions."""
 
-from typing import Callable
-
 import pytest
 
 from docent.data_models.citation import (
-    Citation,
     ParsedCitation,
     parse_citations,
     parse_single_citation,
 )
 
+# (text, expected (transcript_idx, block_idx, metadata_key, start_pattern) tuples, test id)
+_PARSE_CITATIONS_CASES: list[
+    tuple[str, list[tuple[int | None, int | None, str | None, str | None]], str]
+] = [
+    # Block citations
+    ("Basic [T1B2] citation.", [(1, 2, None, None)], "single_basic"),
+    (
+        "Multiple [T1B2] and [T3B4] citations.",
+        [(1, 2, None, None), (3, 4, None, None)],
+        "single_multiple",
+    ),
+    ("Spaced [ T1B2 ] citations.", [(1, 2, None, None)], "single_whitespace"),
+    # No valid citations
+    ("No citations here.", [], "none"),
+    ("", [], "empty"),
+    ("Invalid [brackets] content.", [], "invalid"),
+    # Agent run metadata
+    (
+        "The task was [M.task_description] and it succeeded.",
+        [(None, None, "task_description", None)],
+        "agent_run_metadata",
+    ),
+    # Transcript metadata
+    (
+        "Started at [T0M.start_time] according to the logs.",
+        [(0, None, "start_time", None)],
+        "transcript_metadata",
+    ),
+    # Message metadata
+    (
+        "The message status was [T0B1M.status] at that point.",
+        [(0, 1, "status", None)],
+        "message_metadata",
+    ),
+    # Message metadata with text range
+    (
+        "The response contained [T0B1M.result:<RANGE>success</RANGE>] indicating completion.",
+        [(0, 1, "result", "success")],
+        "message_metadata_with_range",
+    ),
+    # Mixed citations
+    (
+        "Agent [M.name] processed [T0B1] with status [T1B2M.result].",
+        [(None, None, "name", None), (0, 1, None, None), (1, 2, "result", None)],
+        "mixed_citations",
+    ),
+]
+
 
 @pytest.mark.unit
 @pytest.mark.parametrize(
-    "parser_func,text,expected_citations,test_description",
-    [
-        # Single-run citation tests
-        (parse_citations, "Basic [T1B2] citation.", [(1, 2)], "single_basic"),
-        (
-            parse_citations,
-            "Multiple [T1B2] and [T3B4] citations.",
-            [(1, 2), (3, 4)],
-            "single_multiple",
-        ),
-        (
-            parse_citations,
-            "Spaced [ T1B2 ] citations.",
-            [(1, 2)],
-            "single_whitespace",
-        ),
-    ],
+    "text,expected_citations",
+    [case[:2] for case in _PARSE_CITATIONS_CASES],
+    ids=[case[2] for case in _PARSE_CITATIONS_CASES],
 )
-def test_valid_citations(
-    parser_func: Callable[[str], tuple[str, list[Citation]]],
+def test_parse_citations(
     text: str,
-    expected_citations: list[tuple[int, ...]],
-    test_description: str,
+    expected_citations: list[tuple[int | None, int | None, str | None, str | None]],
 ):
-    """Test parsing of valid citation patterns."""
-    _cleaned, result = parser_func(text)
-    assert len(result) == len(expected_citations), f"Failed for {test_description}"
+    """Test parsing of block and metadata citation patterns, and text without citations."""
+    _cleaned, result = parse_citations(text)
+    assert len(result) == len(
+        expected_citations
+    ), f"Expected {len(expected_citations)} citations, got {len(result)}"
 
-    # Convert results to tuples for comparison
-    actual_citations = [(c.transcript_idx, c.block_idx) for c in result]
+    # Convert results to tuples for comparison (transcript_idx, block_idx, metadata_key, start_pattern)
+    actual_citations = {
+        (c.transcript_idx, c.block_idx, c.metadata_key, c.start_pattern) for c in result
+    }
 
     # Verify all expected citations are present
-    for expected in expected_citations:
-        assert expected in actual_citations, f"Missing citation {expected} in {test_description}"
-
-
-@pytest.mark.unit
-@pytest.mark.parametrize(
-    "parser_func,text,test_description",
-    [
-        (parse_citations, "No citations here.", "none"),
-        (parse_citations, "", "empty"),
-        (parse_citations, "Invalid [brackets] content.", "invalid"),
-    ],
-)
-def test_no_citations_found(
-    parser_func: Callable[[str], tuple[str, list[Citation]]],
-    text: str,
-    test_description: str,
-):
-    """Test cases where no valid citations should be found."""
-    _cleaned, result = parser_func(text)
-    assert len(result) == 0, f"Expected no citations for {test_description}"
+    missing = set(expected_citations) - actual_citations
+    assert not missing, f"Missing citations {missing}. Got: {actual_citations}"
 
 
 @pytest.mark.unit
@@ -128,65 +142,6 @@ def test_range_markers_in_citations():
     assert citations[0].start_pattern == "pattern"
 
 
-@pytest.mark.unit
-@pytest.mark.parametrize(
-    "text,expected_citations,test_description",
-    [
-        # Agent run metadata
-        (
-            "The task was [M.task_description] and it succeeded.",
-            [(None, None, "task_description", None)],
-            "agent_run_metadata",
-        ),
-        # Transcript metadata
-        (
-            "Started at [T0M.start_time] according to the logs.",
-            [(0, None, "start_time", None)],
-            "transcript_metadata",
-        ),
-        # Message metadata
-        (
-            "The message status was [T0B1M.status] at that point.",
-            [(0, 1, "status", None)],
-            "message_metadata",
-        ),
-        # Message metadata with text range
-        (
-            "The response contained [T0B1M.result:<RANGE>success</RANGE>] indicating completion.",
-            [(0, 1, "result", "success")],
-            "message_metadata_with_range",
-        ),
-        # Mixed citations
-        (
-            "Agent [M.name] processed [T0B1] with status [T1B2M.result].",
-            [(None, None, "name", None), (0, 1, None, None), (1, 2, "result", None)],
-            "mixed_citations",
-        ),
-    ],
-)
-def test_metadata_citations(
-    text: str,
-    expected_citations: list[tuple[int | None, int, str | None, str | None]],
-    test_description: str,
-):
-    """Test parsing of metadata citation patterns."""
-    _cleaned, result = parse_citations(text)
-    assert len(result) == len(
-        expected_citations
-    ), f"Failed for {test_description}: expected {len(expected_citations)} citations, got {len(result)}"
-
-    # Convert results to tuples for comparison (transcript_idx, block_idx, metadata_key, start_pattern)
-    actual_citations = [
-        (c.transcript_idx, c.block_idx, c.metadata_key, c.start_pattern) for c in result
-    ]
-
-    # Verify all expected citations are present
-    for expected in expected_citations:
-        assert (
-            expected in actual_citations
-        ), f"Missing citation {expected} in {test_description}. Got: {actual_citations}"
-
-
 @pytest.mark.unit
 @pytest.mark.parametrize(
     "citation_text,expected",
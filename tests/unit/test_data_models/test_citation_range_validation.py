@@ -11,8 +11,9 @@ from docent.data_models.remove_invalid_citation_ranges import (
 from docent.data_models.transcript import Transcript
 
 
-def create_test_agent_run() -> AgentRun:
-    """Create a standardized mock AgentRun for all tests."""
+@pytest.fixture(scope="module")
+def agent_run() -> AgentRun:
+    """A standardized mock AgentRun, shared by the tests since they only read it."""
     messages = [
         UserMessage(content="Hello, can you help?"),
         AssistantMessage(content="I understand the task and will help you."),
@@ -58,12 +59,8 @@ class TestTextCleaning:
     """Test text cleaning functionality."""
 
     @pytest.mark.unit
-    def test_validate_and_clean_citations_scenarios(
-        self,
-    ):
+    def test_validate_and_clean_citations_scenarios(self, agent_run: AgentRun):
         """Test citation validation and cleaning in a single pass."""
-        agent_run = create_test_agent_run()
-
         valid_range_citation = "[T0B1:<RANGE>I understand</RANGE>]"
         invalid_range_citation = "[T0B1:<RANGE>nonexistent</RANGE>]"
         block_citation = "[T0B1]"
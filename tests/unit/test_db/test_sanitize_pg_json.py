@@ -0,0 +1,59 @@
+"""Unit tests for sanitizing JSON-like data before it is stored in Postgres."""
+
+from typing import Any
+
+import pytest
+
+from docent_core.docent.db.schemas.tables import sanitize_pg_json
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    "data,expected",
+    [
+        ("plain", "plain"),
+        ("a\x00b", "ab"),
+        ("a\\u0000b", "ab"),
+        ("a\\x00b", "ab"),
+        ("back\\slash", "back\\slash"),
+        ({"key\x00": "value"}, {"key": "value"}),
+        ({"key\\u0000": "value\\u0000"}, {"key": "value"}),
+        ({1: "one\x00", None: "none"}, {1: "one", None: "none"}),
+        (("a\x00", None, 2), ["a", None, 2]),
+        ({"outer": ("in\x00", {"k\x00": ("deep\x00",)})}, {"outer": ["in", {"k": ["deep"]}]}),
+        (["x\x00", ["y\\x00"], 3.5, True], ["x", ["y"], 3.5, True]),
+        (42, 42),
+        (None, None),
+    ],
+    ids=[
+        "plain_string",
+        "null_character",
+        "escaped_unicode_null",
+        "escaped_hex_null",
+        "other_backslash",
+        "dict_key",
+        "escaped_dict_key_and_value",
+        "non_string_keys",
+        "tuple",
+        "nested_tuples_and_keys",
+        "nested_lists",
+        "number",
+        "none",
+    ],
+)
+def test_sanitize_pg_json(data: Any, expected: Any):
+    """Test that null characters are removed from every string, including dict keys."""
+    assert sanitize_pg_json(data) == expected
+
+
+@pytest.mark.unit
+def test_sanitize_pg_json_updates_containers_in_place():
+    """Test that dicts and lists are sanitized in place rather than copied."""
+    nested = ["x\x00"]
+    data = {"key\x00": nested, "other": "fine"}
+
+    result = sanitize_pg_json(data)
+
+    assert result is data
+    assert result["key"] is nested
+    assert nested == ["x"]
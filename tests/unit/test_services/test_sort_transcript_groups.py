@@ -0,0 +1,51 @@
+"""Unit tests for ordering transcript groups so parents are written before their children."""
+
+import pytest
+
+from docent_core.docent.db.schemas.tables import SQLATranscriptGroup
+from docent_core.docent.services.monoservice import sort_transcript_groups_by_parent_order
+
+# (list of (group id, parent id), expected order of group ids, test id)
+_SORT_CASES: list[tuple[list[tuple[str, str | None]], list[str], str]] = [
+    ([], [], "empty"),
+    ([("a", None), ("b", None)], ["a", "b"], "no_parents"),
+    ([("child", "parent"), ("parent", None)], ["parent", "child"], "child_before_parent"),
+    (
+        [("d", "c"), ("c", "b"), ("b", "a"), ("a", None)],
+        ["a", "b", "c", "d"],
+        "reversed_chain",
+    ),
+    (
+        [("b1", "a"), ("a", None), ("b2", "a"), ("c", "b1")],
+        ["a", "b1", "b2", "c"],
+        "siblings",
+    ),
+    ([("a", "a"), ("b", "a")], ["a", "b"], "self_parent"),
+    ([("a", "b"), ("b", "a"), ("c", None)], ["c", "a", "b"], "cycle"),
+    ([("a", "b"), ("b", "c"), ("c", "a"), ("d", "a")], ["a", "b", "c", "d"], "cycle_with_child"),
+    (
+        [("child", "parent"), ("parent", "outside")],
+        ["parent", "child"],
+        "parent_outside_batch",
+    ),
+]
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    "groups,expected_order",
+    [case[:2] for case in _SORT_CASES],
+    ids=[case[2] for case in _SORT_CASES],
+)
+def test_sort_transcript_groups_by_parent_order(
+    groups: list[tuple[str, str | None]], expected_order: list[str]
+):
+    """Test that parents come first, and that no group is dropped or duplicated."""
+    transcript_groups = [
+        SQLATranscriptGroup(id=group_id, parent_transcript_group_id=parent_id)
+        for group_id, parent_id in groups
+    ]
+
+    result = sort_transcript_groups_by_parent_order(transcript_groups)
+
+    assert [group.id for group in result] == expected_order
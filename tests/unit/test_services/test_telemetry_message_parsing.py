@@ -0,0 +1,279 @@
+"""Unit tests for building chat messages and tool calls from gen_ai span data."""
+
+import json
+from typing import Any
+from unittest.mock import MagicMock
+
+import pytest
+
+import docent_core.docent.services.telemetry as telemetry
+from docent.data_models.chat import ChatMessage
+from docent_core.docent.services.telemetry import TelemetryService
+
+_SPAN = {"span_id": "span_1"}
+_TOOL_USE = {"type": "tool_use", "id": "call_1", "name": "search", "input": {"query": "x"}}
+
+
+@pytest.fixture
+def telemetry_service() -> TelemetryService:
+    return TelemetryService(MagicMock(), MagicMock())
+
+
+def _create_message(
+    telemetry_service: TelemetryService, data: dict[str, Any]
+) -> ChatMessage | None:
+    return telemetry_service._create_message_from_data(data, _SPAN, "test")  # type: ignore
+
+
+def _tool_calls(message: ChatMessage) -> list[tuple[str, str, dict[str, Any]]]:
+    tool_calls = getattr(message, "tool_calls", None) or []
+    return [(tool_call.id, tool_call.function, tool_call.arguments) for tool_call in tool_calls]
+
+
+# (message data, expected role, expected content, expected (id, function, arguments), test id)
+_MESSAGE_CASES: list[
+    tuple[dict[str, Any], str, str, list[tuple[str, str, dict[str, Any]]], str]
+] = [
+    # Plain-string fast path
+    ({"role": "user", "content": "hello"}, "user", "hello", [], "plain_text"),
+    ({"role": "developer", "content": "rules"}, "system", "rules", [], "developer_role"),
+    ({"assistant": "from key"}, "assistant", "from key", [], "role_from_content_key"),
+    # Bracketed text that can't hold any objects
+    ({"role": "user", "content": "[see above]"}, "user", "[see above]", [], "bracketed_text"),
+    ({"role": "user", "content": "[1, 2]"}, "user", "[1, 2]", [], "array_without_objects"),
+    # JSON content arrays
+    (
+        {"role": "assistant", "content": json.dumps([{"type": "text", "text": "Let me look"}])},
+        "assistant",
+        "Let me look",
+        [],
+        "text_item",
+    ),
+    (
+        {
+            "role": "user",
+            "content": json.dumps(
+                [{"type": "input_text", "text": "a"}, {"type": "text", "text": "b"}]
+            ),
+        },
+        "user",
+        "a\nb",
+        [],
+        "multiple_text_items",
+    ),
+    (
+        {
+            "role": "assistant",
+            "content": json.dumps([{"type": "text", "text": "Let me look"}, _TOOL_USE]),
+        },
+        "assistant",
+        "Let me look",
+        [("call_1", "search", {"query": "x"})],
+        "text_and_tool_use",
+    ),
+    (
+        {"role": "assistant", "content": json.dumps([_TOOL_USE])},
+        "assistant",
+        json.dumps([_TOOL_USE]),
+        [("call_1", "search", {"query": "x"})],
+        "tool_use_only_keeps_raw_content",
+    ),
+    (
+        {"role": "assistant", "content": json.dumps([{**_TOOL_USE, "input": "raw"}])},
+        "assistant",
+        json.dumps([{**_TOOL_USE, "input": "raw"}]),
+        [("call_1", "search", {})],
+        "tool_use_string_input",
+    ),
+    # Nested tool_result content
+    (
+        {
+            "role": "user",
+            "content": json.dumps(
+                [
+                    {
+                        "type": "tool_result",
+                        "content": [{"type": "text", "text": "a"}, {"type": "text", "text": "b"}],
+                    }
+                ]
+            ),
+        },
+        "user",
+        "a\nb",
+        [],
+        "tool_result_text_list",
+    ),
+    (
+        {
+            "role": "user",
+            "content": json.dumps(
+                [
+                    {
+                        "type": "tool_result",
+                        "content": [{"type": "text", "text": "outer"}, {"type": "image"}],
+                    },
+                    {"type": "tool_result", "content": [{"type": "image"}]},
+                ]
+            ),
+        },
+        "user",
+        'outer\n[{"type": "image"}]',
+        [],
+        "tool_result_list_without_text",
+    ),
+    (
+        {"role": "user", "content": json.dumps([{"type": "tool_result", "content": "out"}])},
+        "user",
+        '"out"',
+        [],
+        "tool_result_string",
+    ),
+    # Content that isn't valid JSON to pydantic_core falls back to the raw text
+    (
+        {"role": "user", "content": '[{"type": "text", "text": "\\ud800"}]'},
+        "user",
+        '[{"type": "text", "text": "\\ud800"}]',
+        [],
+        "lone_surrogate",
+    ),
+    (
+        {"role": "user", "content": '[{"type": "text", "text": "cut off"}'},
+        "user",
+        '[{"type": "text", "text": "cut off"}',
+        [],
+        "unterminated_array",
+    ),
+]
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    "data,expected_role,expected_content,expected_tool_calls",
+    [case[:4] for case in _MESSAGE_CASES],
+    ids=[case[4] for case in _MESSAGE_CASES],
+)
+def test_create_message_from_data(
+    telemetry_service: TelemetryService,
+    data: dict[str, Any],
+    expected_role: str,
+    expected_content: str,
+    expected_tool_calls: list[tuple[str, str, dict[str, Any]]],
+):
+    """Test the role, content and tool calls of messages built from span data."""
+    message = _create_message(telemetry_service, data)
+
+    assert message is not None
+    assert message.role == expected_role
+    assert message.content == expected_content
+    assert _tool_calls(message) == expected_tool_calls
+
+
+@pytest.mark.unit
+def test_create_message_from_data_with_reasoning(telemetry_service: TelemetryService):
+    """Test that reasoning takes the content-parts path even for plain-text content."""
+    message = _create_message(
+        telemetry_service, {"role": "assistant", "content": "answer", "reasoning": "thinking"}
+    )
+
+    assert message is not None
+    assert not isinstance(message.content, str)
+    assert [part.type for part in message.content] == ["reasoning", "text"]
+    assert message.text == "answer"
+
+
+@pytest.mark.unit
+def test_create_message_from_data_without_role(telemetry_service: TelemetryService):
+    """Test that data without a role or a role-bearing content key yields no message."""
+    assert _create_message(telemetry_service, {"content": "hello"}) is None
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    "content",
+    ["hello", "", "[see above]", "[1, 2]", "[]", "ends with ]", "[starts with"],
+    ids=[
+        "plain",
+        "empty",
+        "bracketed",
+        "array_without_objects",
+        "empty_array",
+        "trailing_bracket",
+        "leading_bracket",
+    ],
+)
+def test_fast_path_matches_content_array_path(
+    telemetry_service: TelemetryService, content: str, monkeypatch: pytest.MonkeyPatch
+):
+    """Test that content skipped by the fast paths is left unchanged by the full extraction."""
+
+    def fail_parse(content: str) -> None:
+        raise AssertionError(f"Content without objects was parsed: {content}")
+
+    monkeypatch.setattr(telemetry, "_parse_content_array", fail_parse)
+
+    message = _create_message(telemetry_service, {"role": "user", "content": content})
+
+    assert message is not None
+    assert message.content == content
+    assert telemetry_service._extract_tool_calls_from_content(content) == (content, None)  # type: ignore
+
+
+@pytest.mark.unit
+def test_tool_use_arguments_do_not_share_cached_parse(telemetry_service: TelemetryService):
+    """Test that tool call arguments are copied out of the cached content parse."""
+    data = {"role": "assistant", "content": json.dumps([{"type": "text", "text": "hi"}, _TOOL_USE])}
+
+    first = _create_message(telemetry_service, data)
+    assert first is not None
+    _tool_calls(first)[0][2]["query"] = "mutated"
+
+    second = _create_message(telemetry_service, data)
+    assert second is not None
+    assert _tool_calls(second) == [("call_1", "search", {"query": "x"})]
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    "arguments,expected",
+    [
+        ('{"a": 1, "b": [true, null]}', {"a": 1, "b": [True, None]}),
+        ({"a": 1, "b": [True, None]}, {"a": 1, "b": [True, None]}),
+        ("not json", {"raw_arguments": "not json"}),
+        ('{"a": "\\ud800"}', {"raw_arguments": '{"a": "\\ud800"}'}),
+    ],
+    ids=["json_string", "dict", "invalid_string", "lone_surrogate"],
+)
+def test_structured_tool_call_arguments(
+    telemetry_service: TelemetryService, arguments: str | dict[str, Any], expected: dict[str, Any]
+):
+    """Test that tool call arguments are parsed from strings and passed through as dicts."""
+    message = _create_message(
+        telemetry_service,
+        {
+            "role": "assistant",
+            "content": "calling",
+            "tool_calls": {"0": {"id": "call_1", "name": "search", "arguments": arguments}},
+        },
+    )
+
+    assert message is not None
+    assert _tool_calls(message) == [("call_1", "search", expected)]
+
+
+@pytest.mark.unit
+def test_structured_tool_calls_keep_index_order(telemetry_service: TelemetryService):
+    """Test that structured tool calls are ordered by index and follow content tool calls."""
+    message = _create_message(
+        telemetry_service,
+        {
+            "role": "assistant",
+            "content": json.dumps([{"type": "text", "text": "calling"}, _TOOL_USE]),
+            "tool_calls": {
+                "1": {"id": "call_3", "name": "b", "arguments": "{}"},
+                "0": {"id": "call_2", "name": "a", "arguments": {}},
+            },
+        },
+    )
+
+    assert message is not None
+    assert [tool_call[0] for tool_call in _tool_calls(message)] == ["call_1", "call_2", "call_3"]
@@ -0,0 +1,212 @@
+"""Unit tests for the chat thread matching helpers in the telemetry service."""
+
+from typing import Any
+from unittest.mock import MagicMock
+
+import pytest
+
+from docent.data_models.chat import (
+    AssistantMessage,
+    ChatMessage,
+    SystemMessage,
+    ToolMessage,
+    UserMessage,
+)
+from docent.data_models.chat.tool import ToolCall
+from docent_core.docent.services.telemetry import (
+    MessageFingerprint,
+    TelemetryService,
+    _chat_thread_head_keys,
+    _message_fingerprint,
+    _parse_content_array,
+)
+
+
+def _tool_call(call_id: str) -> ToolCall:
+    return ToolCall(id=call_id, function="search", arguments={"query": call_id}, type="function")
+
+
+def _assistant(text: str, *call_ids: str) -> AssistantMessage:
+    return AssistantMessage(
+        content=text, tool_calls=[_tool_call(call_id) for call_id in call_ids] or None
+    )
+
+
+@pytest.fixture
+def telemetry_service() -> TelemetryService:
+    return TelemetryService(MagicMock(), MagicMock())
+
+
+@pytest.mark.unit
+def test_message_fingerprint_matches_equal_messages():
+    """Test that equal messages share a fingerprint and differing role or text don't."""
+    fingerprint = _message_fingerprint(UserMessage(content="hello"))
+
+    assert _message_fingerprint(UserMessage(content="hello")) == fingerprint
+    assert _message_fingerprint(UserMessage(content="hello!")) != fingerprint
+    assert _message_fingerprint(AssistantMessage(content="hello")) != fingerprint
+
+
+@pytest.mark.unit
+def test_message_fingerprint_cache():
+    """Test that fingerprints are cached by message identity, keeping the message alive."""
+    message = UserMessage(content="hello")
+    cache: dict[int, tuple[ChatMessage, MessageFingerprint]] = {}
+
+    fingerprint = _message_fingerprint(message, cache)
+
+    assert cache == {id(message): (message, fingerprint)}
+    assert _message_fingerprint(message, cache) is fingerprint
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    "message,expected_keys",
+    [
+        (UserMessage(content="hello"), [("user", "hello")]),
+        (_assistant("plain reply"), [("assistant", "plain reply")]),
+        (
+            _assistant("calling", "call_1", "call_2"),
+            [("assistant", "calling"), frozenset({"call_1", "call_2"})],
+        ),
+        (ToolMessage(content="result", tool_call_id="call_1"), [None]),
+        (ToolMessage(content="result"), [("tool", "result")]),
+    ],
+    ids=["user", "assistant_text", "assistant_tool_calls", "tool_with_id", "tool_without_id"],
+)
+def test_chat_thread_head_keys(message: ChatMessage, expected_keys: list[Any]):
+    """Test the index keys of a thread's first message."""
+    assert _chat_thread_head_keys(message) == expected_keys
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    "content,expected",
+    [
+        (
+            '[{"type": "text", "text": "hi"}, {"type": "tool_use", "id": "call_1"}]',
+            ({"type": "text", "text": "hi"}, {"type": "tool_use", "id": "call_1"}),
+        ),
+        ('[{"type": "text", "text": "hi"}, "loose", 1, null]', ({"type": "text", "text": "hi"},)),
+        ("[]", ()),
+        ('{"type": "text", "text": "hi"}', None),
+        ("[not json]", None),
+        ("plain text", None),
+    ],
+    ids=["objects", "non_object_items", "empty_array", "object", "invalid_json", "plain_text"],
+)
+def test_parse_content_array(content: str, expected: tuple[dict[str, Any], ...] | None):
+    """Test that only the object items of a JSON array are kept, and anything else is None."""
+    assert _parse_content_array(content) == expected
+
+
+# (existing thread, new thread, expected match, test id)
+_MATCHING_THREAD_START_CASES: list[tuple[list[ChatMessage], list[ChatMessage], bool, str]] = [
+    # Plain text content
+    (
+        [SystemMessage(content="be helpful"), UserMessage(content="hi")],
+        [SystemMessage(content="be helpful"), UserMessage(content="hi"), _assistant("hello")],
+        True,
+        "plain_extension",
+    ),
+    (
+        [UserMessage(content="hi"), _assistant("hello")],
+        [UserMessage(content="hi"), _assistant("hello")],
+        True,
+        "identical",
+    ),
+    (
+        [UserMessage(content="hi"), _assistant("hello")],
+        [UserMessage(content="hi")],
+        False,
+        "new_thread_shorter",
+    ),
+    (
+        [UserMessage(content="hi"), _assistant("hello")],
+        [UserMessage(content="hi"), _assistant("goodbye")],
+        False,
+        "diverging_text",
+    ),
+    (
+        [UserMessage(content="hi")],
+        [AssistantMessage(content="hi")],
+        False,
+        "diverging_role",
+    ),
+    ([], [UserMessage(content="hi")], False, "empty_existing"),
+    ([UserMessage(content="hi")], [], False, "empty_new"),
+    # Tool ids
+    (
+        [
+            UserMessage(content="search"),
+            _assistant("calling", "call_1"),
+            ToolMessage(content="first output", tool_call_id="call_1"),
+        ],
+        [
+            UserMessage(content="search"),
+            _assistant("calling search", "call_1"),
+            ToolMessage(content="second output", tool_call_id="call_1"),
+            _assistant("done"),
+        ],
+        True,
+        "same_tool_ids_different_text",
+    ),
+    (
+        [UserMessage(content="search"), _assistant("calling", "call_1")],
+        [UserMessage(content="search"), _assistant("calling again", "call_1", "call_2")],
+        False,
+        "different_tool_call_ids",
+    ),
+    (
+        [UserMessage(content="search"), ToolMessage(content="output", tool_call_id="call_1")],
+        [UserMessage(content="search"), ToolMessage(content="other", tool_call_id="call_2")],
+        False,
+        "unrelated_tool_result_ids",
+    ),
+    (
+        [
+            UserMessage(content="search"),
+            ToolMessage(content="output", tool_call_id="call_1"),
+            _assistant("calling", "call_1"),
+        ],
+        [UserMessage(content="search"), _assistant("calling", "call_1")],
+        True,
+        "tool_result_seen_in_new_thread_skipped",
+    ),
+    (
+        [UserMessage(content="search"), _assistant("calling", "call_1")],
+        [
+            UserMessage(content="search"),
+            ToolMessage(content="output", tool_call_id="call_1"),
+            _assistant("calling", "call_1"),
+        ],
+        True,
+        "tool_result_seen_in_existing_thread_skipped",
+    ),
+]
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    "existing_thread,new_thread,expected",
+    [case[:3] for case in _MATCHING_THREAD_START_CASES],
+    ids=[case[3] for case in _MATCHING_THREAD_START_CASES],
+)
+def test_matching_thread_start(
+    telemetry_service: TelemetryService,
+    existing_thread: list[ChatMessage],
+    new_thread: list[ChatMessage],
+    expected: bool,
+):
+    """Test matching the start of a new thread against an existing one."""
+    assert telemetry_service.matching_thread_start(existing_thread, new_thread) is expected
+
+    # Sharing a fingerprint cache across calls must not change the outcome
+    cache: dict[int, tuple[ChatMessage, MessageFingerprint]] = {}
+    for _ in range(2):
+        assert (
+            telemetry_service.matching_thread_start(
+                existing_thread, new_thread, message_fingerprints=cache
+            )
+            is expected
+        )